@@ -1,16 +1,20 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import Optional, List
 from dotenv import load_dotenv
 import uvicorn
 import os
+import json
 import requests
 import io
 from pypdf import PdfReader
 from docx import Document
 
-from inference_engine import generate_lekhAI_script
+import inference_engine
+from inference_engine import generate_lekhAI_script, stream_lekhAI_script
 from routers import scripts, brand_voice
 from models.script_model import ScriptModel, ScriptCreate
 
@@ -19,6 +23,21 @@ load_dotenv()
 
 app = FastAPI(title="LekhAI API", version="1.0")
 
+# LEKHAI_SERVING_MODE=preload: load the corpus here, in the parent, so forked workers share it
+if inference_engine.SERVING_MODE == "preload":
+    inference_engine.preload_shared_state()
+
+@app.on_event("startup")
+def start_engine():
+    # Models, dataset and embeddings load in the background so the port binds immediately
+    # (in preload mode only the per-worker phases are left to run)
+    inference_engine.start_background_initialization()
+    inference_engine.start_corpus_watcher()
+
+@app.on_event("shutdown")
+async def stop_engine():
+    await inference_engine.gemini_pool.aclose()
+
 # Include Routers
 app.include_router(scripts.router)
 app.include_router(brand_voice.router)
@@ -78,12 +97,83 @@ async def parse_document(request: ParseRequest):
 
 @app.get("/")
 def home():
+    # Liveness only — must stay cheap and never touch the engine
     return {"status": "LekhAI API is running", "version": "1.0"}
 
+@app.get("/ready")
+def ready():
+    """Readiness: which engine components are loaded. 503 until everything is up."""
+    status = inference_engine.get_readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/metrics")
+def metrics():
+    """Runtime metrics (Gemini connection reuse, ...)."""
+    return inference_engine.get_metrics()
+
+def _require_admin(token):
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set).")
+    if token != expected:
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+@app.post("/admin/reload-corpus", status_code=202)
+def reload_corpus(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Re-reads the dataset and swaps in the new index in the background (only changed rows are re-embedded)."""
+    _require_admin(x_admin_token)
+    started = inference_engine.start_corpus_reload(force=force)
+    return {"started": started, "status": dict(inference_engine.RELOAD_STATUS)}
+
+@app.get("/admin/reload-corpus")
+def reload_corpus_status(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return {"corpus": inference_engine.corpus.describe(), "status": dict(inference_engine.RELOAD_STATUS)}
+
+def _require_engine():
+    if not inference_engine.is_retrieval_ready():
+        status = inference_engine.get_readiness()
+        detail = f"Engine failed to start: {status['error']}" if status["state"] == "failed" else "Engine is still starting up. Please retry shortly."
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "10"})
+
+async def _save_script(req, result):
+    """Auto-saves a generated script to the database; returns its id, or None if saving failed."""
+    try:
+        # Extract inferred metadata if available
+        details = result.get("details", {})
+        clf = details.get("classification", {})
+        
+        final_industry = clf.get("matched_industry") or req.industry or "General"
+        
+        # Helper to join tones
+        raw_tones = clf.get("matched_tones") or req.tones or []
+        final_tone = ", ".join(raw_tones) if isinstance(raw_tones, list) else str(raw_tones)
+        
+        script_data = ScriptCreate(
+            prompt=req.prompt,
+            script_content=result.get("script", ""),
+            industry=final_industry,
+            tone=final_tone,
+            product=req.product_name,
+            duration=req.duration,
+            ad_type=req.ad_type
+        )
+        
+        saved = await inference_engine.run_blocking(ScriptModel.create, script_data)
+        if saved:
+            print("Generated script saved to DB:", saved.get("id"))
+            return saved.get("id")
+            
+    except Exception as db_err:
+        print(f"[WARN] Failed to save script to DB: {db_err}")
+        # We don't block the response, just warn
+    return None
+
 @app.post("/generate")
-def generate_script(req: ScriptRequest):
+async def generate_script(req: ScriptRequest):
+    _require_engine()
     try:
-        result = generate_lekhAI_script(
+        result = await generate_lekhAI_script(
             prompt=req.prompt,
             product=req.product_name,
             industry=req.industry,
@@ -94,41 +184,56 @@ def generate_script(req: ScriptRequest):
             dialect=req.dialect
         )
         
-        # Auto-save to Database
-        try:
-            # Extract inferred metadata if available
-            details = result.get("details", {})
-            clf = details.get("classification", {})
-            
-            final_industry = clf.get("matched_industry") or req.industry or "General"
-            
-            # Helper to join tones
-            raw_tones = clf.get("matched_tones") or req.tones or []
-            final_tone = ", ".join(raw_tones) if isinstance(raw_tones, list) else str(raw_tones)
-            
-            script_data = ScriptCreate(
-                prompt=req.prompt,
-                script_content=result.get("script", ""),
-                industry=final_industry,
-                tone=final_tone,
-                product=req.product_name,
-                duration=req.duration,
-                ad_type=req.ad_type
-            )
-            
-            saved = ScriptModel.create(script_data)
-            if saved:
-                result["db_id"] = saved.get("id")
-                print("Generated script saved to DB:", saved.get("id"))
-                
-        except Exception as db_err:
-            print(f"[WARN] Failed to save script to DB: {db_err}")
-            # We don't block the response, just warn
+        db_id = await _save_script(req, result)
+        if db_id:
+            result["db_id"] = db_id
             
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+@app.post("/generate/stream")
+async def generate_script_stream(req: ScriptRequest):
+    """
+    /generate as Server-Sent Events: `token` events ({"text": ...}, sanitized) while Gemini writes
+    the script, then one `done` event with the /generate result (script, warning, mode, details,
+    db_id, time, time_to_first_token). A failure mid-way ends the stream with an `error` event.
+    """
+    _require_engine()
+    events = stream_lekhAI_script(
+        prompt=req.prompt,
+        product=req.product_name,
+        industry=req.industry,
+        tones=req.tones,
+        duration=req.duration,
+        ad_type=req.ad_type,
+        turbo=req.turbo,
+        dialect=req.dialect
+    )
+
+    async def relay():
+        try:
+            async for event, payload in events:
+                if event == "token":
+                    yield _sse("token", {"text": payload})
+                    continue
+                db_id = await _save_script(req, payload)
+                if db_id:
+                    payload["db_id"] = db_id
+                yield _sse("done", payload)
+        except Exception as e:
+            print(f"[ERROR] Streaming generation failed: {e}")
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            await events.aclose()
+
+    # X-Accel-Buffering: proxies (nginx, HF Spaces) must pass events through instead of buffering the body
+    return StreamingResponse(relay(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 7860))  # 7860 = HF Spaces default
     uvicorn.run(app, host="0.0.0.0", port=port)
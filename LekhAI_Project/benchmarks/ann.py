@@ -0,0 +1,67 @@
+"""
+ANN benchmark — recall@k and latency of the HNSW path vs. exact brute force on synthetic
+normalized vectors (clustered, like real sentence embeddings) at growing corpus sizes.
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.ann [--sizes 1000 10000 100000 1000000] [--queries 200] [--k 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils.ann_index import HnswIndex, exact_top_k
+from utils.embedding_cache import normalize_rows
+
+DIM = 384  # all-MiniLM-L6-v2
+
+
+def synthetic_corpus(n, dim=DIM, latent_dim=48, clusters=64, seed=0):
+    """Clustered points on a low-dimensional subspace (sentence embeddings have low intrinsic dimension)."""
+    rng = np.random.default_rng(seed)
+    projection = np.random.default_rng(12345).standard_normal((latent_dim, dim), dtype=np.float32)
+    centers = np.random.default_rng(54321).standard_normal((clusters, latent_dim), dtype=np.float32)
+    labels = rng.integers(0, clusters, n)
+    latent = centers[labels] + 0.5 * rng.standard_normal((n, latent_dim), dtype=np.float32)
+    vectors = latent @ projection + 0.05 * rng.standard_normal((n, dim), dtype=np.float32)
+    return normalize_rows(vectors)
+
+
+def _latencies(fn, queries):
+    samples = []
+    for q in queries:
+        t = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - t) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'build s':>9}{'recall@'+str(args.k):>10}"
+          f"{'exact p50':>11}{'exact p99':>11}{'hnsw p50':>10}{'hnsw p99':>10}  (ms)")
+    for n in args.sizes:
+        corpus = synthetic_corpus(n)
+        queries = synthetic_corpus(args.queries, seed=n + 1)
+        truth, _ = exact_top_k(corpus, queries, args.k)
+
+        t = time.perf_counter()
+        ann = HnswIndex(corpus)
+        build_s = time.perf_counter() - t
+
+        found, _ = ann.query(queries, args.k)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(truth, found)])
+
+        exact_p50, exact_p99 = _latencies(lambda q: exact_top_k(corpus, q, args.k), queries)
+        hnsw_p50, hnsw_p99 = _latencies(lambda q: ann.query(q, args.k), queries)
+        print(f"{n:>10}{build_s:>9.1f}{recall:>10.3f}{exact_p50:>11.3f}{exact_p99:>11.3f}{hnsw_p50:>10.3f}{hnsw_p99:>10.3f}")
+        del corpus, ann
+
+
+if __name__ == "__main__":
+    main()
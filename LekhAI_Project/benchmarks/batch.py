@@ -0,0 +1,77 @@
+"""
+Batched retrieval benchmark — queries/second of CorpusIndex.top_k_batch against batch size,
+with and without query encoding, on the real corpus (optionally padded with synthetic scripts
+to show how the matrix-matrix product scales).
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.batch [--batch-sizes 1 8 32 128] [--mode hybrid] [--synthetic-rows 0]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.ann import synthetic_corpus
+from utils.corpus import load_corpus
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import load_embeddings
+from utils.encoders import DEFAULT_MODEL, ENCODER_BACKEND, load_encoder
+from utils.scene_chunks import scene_chunks
+
+DATASET_PATH = "Ad Script Dataset.xlsx"
+
+
+def _throughput(fn, queries, batch_size, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        for start in range(0, len(queries), batch_size):
+            fn(queries[start:start + batch_size])
+        best = min(best, time.perf_counter() - t)
+    return len(queries) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--mode", choices=["dense", "hybrid"], default="hybrid")
+    parser.add_argument("--synthetic-rows", type=int, default=0, help="extra synthetic scripts (one chunk each)")
+    parser.add_argument("--backend", default=ENCODER_BACKEND)
+    parser.add_argument("--model", default=os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL))
+    args = parser.parse_args()
+
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(args.backend, args.model)
+    chunk_texts, offsets = scene_chunks(df)
+    embeddings = np.asarray(load_embeddings(encoder.cache_key, chunk_texts, encoder.encode))
+    if args.synthetic_rows:
+        extra = synthetic_corpus(args.synthetic_rows, dim=embeddings.shape[1])
+        df = pd.concat([df, df.sample(args.synthetic_rows, replace=True, random_state=0)], ignore_index=True)
+        offsets = np.concatenate([offsets, offsets[-1] + np.arange(1, args.synthetic_rows + 1)])
+        embeddings = np.vstack([embeddings, extra])
+    index = CorpusIndex(df, embeddings, chunk_offsets=offsets, ann_threshold=len(embeddings) + 1)
+
+    queries = [p[:300] for col in ("prompt_1", "prompt_2", "prompt_3") for p in df[col].dropna()][:512]
+    query_vecs = encoder.encode(queries)
+    hybrid = args.mode == "hybrid"
+
+    def search_only(batch_ids):
+        index.top_k_batch(query_vecs[batch_ids], 5, [queries[i] for i in batch_ids] if hybrid else None)
+
+    def encode_and_search(batch_ids):
+        texts = [queries[i] for i in batch_ids]
+        index.top_k_batch(encoder.encode(texts), 5, texts if hybrid else None)
+
+    ids = np.arange(len(queries))
+    print(f"\n{len(df)} scripts / {len(embeddings)} chunks, {len(queries)} queries, {args.mode} search")
+    print(f"{'batch':>6}{'search q/s':>12}{'encode+search q/s':>20}")
+    for batch_size in args.batch_sizes:
+        search_qps = _throughput(search_only, ids, batch_size)
+        total_qps = _throughput(encode_and_search, ids, batch_size, repeats=1)
+        print(f"{batch_size:>6}{search_qps:>12.0f}{total_qps:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
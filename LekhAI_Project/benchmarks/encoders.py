@@ -0,0 +1,88 @@
+"""
+Encoder backend benchmark — per-query encode latency and process RSS for each backend.
+
+Each backend runs in its own subprocess so RSS numbers are not polluted by the others.
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.encoders [--backends torch onnx onnx-int8] [--queries 200]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from utils.encoders import BACKENDS, DEFAULT_MODEL
+
+SAMPLE_QUERIES = [
+    "FMCG Humorous Write a funny ad for Summer Dose orange lolly ice cream",
+    "Real Estate & Construction Warm & Nostalgic 60 second TVC for a housing project in Dhaka",
+    "Financial Services Empowering bKash merchant app documentary style OVC",
+    "Healthcare & Pharma Informative/Instructional sanitary napkin awareness ad",
+    "ঈদের জন্য একটি আবেগঘন বিজ্ঞাপন লিখুন",
+]
+
+
+def _worker(backend, model_name, n_queries):
+    from utils.memory import rss_mb
+
+    base_rss = rss_mb()
+    t = time.perf_counter()
+    from utils.encoders import load_encoder
+    encoder = load_encoder(backend, model_name)
+    load_s = time.perf_counter() - t
+    loaded_rss = rss_mb()
+
+    encoder.encode(SAMPLE_QUERIES[:1])  # first call pays lazy init; not counted
+    latencies = []
+    for i in range(n_queries):
+        q = SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]
+        t = time.perf_counter()
+        encoder.encode([q])
+        latencies.append((time.perf_counter() - t) * 1000)
+    latencies.sort()
+
+    print("RESULT:" + json.dumps({
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "rss_base_mb": round(base_rss, 1),
+        "rss_loaded_mb": round(loaded_rss, 1),
+        "rss_after_mb": round(rss_mb(), 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.model, args.queries)
+        return
+
+    rows = []
+    for backend in args.backends:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.encoders", "--worker", backend,
+             "--model", args.model, "--queries", str(args.queries)],
+            capture_output=True, text=True, encoding="utf-8",
+        )
+        line = next((l for l in out.stdout.splitlines() if l.startswith("RESULT:")), None)
+        if line is None:
+            print(f"[WARN] {backend} failed:\n{out.stderr.strip()[-500:]}")
+            continue
+        rows.append(json.loads(line[len("RESULT:"):]))
+
+    print(f"\n{'backend':<12}{'load s':>8}{'p50 ms':>9}{'p95 ms':>9}{'RSS loaded MB':>15}{'RSS after MB':>14}")
+    for r in rows:
+        print(f"{r['backend']:<12}{r['load_s']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['rss_loaded_mb']:>15}{r['rss_after_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Ranking metrics for the retrieval benchmarks.
+
+`gains` holds every corpus row's graded relevance to one query (0 = not relevant); `ranked` is the
+returned row order, best first.
+    recall@k  relevant rows in the top k / min(k, relevant rows)  (1.0 = the top k is all relevant)
+    RR        1 / rank of the first relevant row (0 when none is returned); MRR is its mean
+    nDCG@k    sum((2^gain - 1) / log2(rank + 1)) over the top k, divided by the ideal ordering's
+"""
+import numpy as np
+
+
+def score_ranking(ranked, gains, k: int, min_gain: int = 1) -> dict:
+    """recall@k, reciprocal rank and nDCG@k of one ranking; None when nothing is relevant."""
+    gains = np.asarray(gains, dtype=np.float64)
+    n_relevant = int(np.count_nonzero(gains >= min_gain))
+    if n_relevant == 0:
+        return None
+    got = gains[np.asarray(ranked, dtype=np.int64)[:k]]
+    hits = np.flatnonzero(got >= min_gain)
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    ideal = np.sort(gains)[::-1][:k]
+    return {
+        "recall": len(hits) / min(k, n_relevant),
+        "rr": 1.0 / (hits[0] + 1) if len(hits) else 0.0,
+        "ndcg": float(((2.0 ** got - 1) * discounts[:len(got)]).sum() / ((2.0 ** ideal - 1) * discounts[:len(ideal)]).sum()),
+    }
+
+
+def summarize(scored, k: int) -> dict:
+    """Mean metrics over the queries that had at least one relevant row."""
+    scored = [s for s in scored if s is not None]
+    if not scored:
+        return {"queries": 0, "k": k, "recall": None, "mrr": None, "ndcg": None}
+    return {
+        "queries": len(scored),
+        "k": k,
+        "recall": round(float(np.mean([s["recall"] for s in scored])), 4),
+        "mrr": round(float(np.mean([s["rr"] for s in scored])), 4),
+        "ndcg": round(float(np.mean([s["ndcg"] for s in scored])), 4),
+    }
+
+
+def latency_summary(samples_ms) -> dict:
+    return {
+        "p50_ms": round(float(np.percentile(samples_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(samples_ms, 99)), 3),
+    }
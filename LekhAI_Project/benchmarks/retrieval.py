@@ -0,0 +1,79 @@
+"""
+Retrieval benchmark — dense-only vs. hybrid (dense + BM25, reciprocal rank fusion) on the real corpus,
+with BM25 alone for reference.
+
+Known-item queries, each with its source script as the one relevant row:
+    prompts  the dataset's own briefs (prompt_1..3, mostly English)
+    bangla   an 8-token Bangla phrase taken from the middle of each script
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.retrieval [--k 5] [--backend onnx] [--model all-MiniLM-L6-v2]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from utils.corpus import load_corpus
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import load_embeddings
+from utils.encoders import DEFAULT_MODEL, ENCODER_BACKEND, encoder_cache_key, load_encoder
+from utils.lexical_index import tokenize
+from utils.scene_chunks import scene_chunks
+
+DATASET_PATH = "Ad Script Dataset.xlsx"
+
+
+def query_sets(df):
+    prompts, bangla = [], []
+    for row_id, row in enumerate(df[["prompt_1", "prompt_2", "prompt_3", "script"]].itertuples(index=False)):
+        for prompt in row[:3]:
+            if isinstance(prompt, str) and prompt.strip():
+                prompts.append((prompt[:300], row_id))
+        tokens = [t for t in tokenize(row[3]) if not t.isascii()]
+        if len(tokens) >= 16:
+            mid = len(tokens) // 2
+            bangla.append((" ".join(tokens[mid:mid + 8]), row_id))
+    return {"prompts": prompts, "bangla": bangla}
+
+
+def evaluate(index, encoder, queries, k, mode):
+    texts = [q for q, _ in queries]
+    vectors = encoder.encode(texts)
+    hits, reciprocal_ranks, latencies = [], [], []
+    for text, vec, (_, relevant) in zip(texts, vectors, queries):
+        t = time.perf_counter()
+        if mode == "bm25":
+            top, _ = index.lexical.top_k(text, k)
+        else:
+            top, _ = index.top_k(vec, k, text if mode == "hybrid" else None)
+        latencies.append((time.perf_counter() - t) * 1000)
+        ranks = np.flatnonzero(np.asarray(top) == relevant)
+        hits.append(len(ranks) > 0)
+        reciprocal_ranks.append(1.0 / (ranks[0] + 1) if len(ranks) else 0.0)
+    return np.mean(hits), np.mean(reciprocal_ranks), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--backend", default=ENCODER_BACKEND)
+    parser.add_argument("--model", default=os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL))
+    args = parser.parse_args()
+
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(args.backend, args.model)
+    chunk_texts, offsets = scene_chunks(df)
+    embeddings = load_embeddings(encoder_cache_key(args.backend, args.model), chunk_texts, encoder.encode)
+    index = CorpusIndex(df, embeddings, chunk_offsets=offsets)
+
+    print(f"\n{'queries':<10}{'mode':<8}{'n':>5}{'recall@'+str(args.k):>10}{'MRR':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, queries in query_sets(df).items():
+        for mode in ("dense", "hybrid", "bm25"):
+            recall, mrr, p50, p99 = evaluate(index, encoder, queries, args.k, mode)
+            print(f"{name:<10}{mode:<8}{len(queries):>5}{recall:>10.3f}{mrr:>8.3f}{p50:>9.3f}{p99:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
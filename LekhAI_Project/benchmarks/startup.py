@@ -0,0 +1,48 @@
+"""
+Startup benchmark — compares the corpus snapshot load with the original
+pd.read_excel + cleaning path.
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.startup [--repeats 5]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from utils.corpus import build_snapshot, clean_dataset, load_corpus, read_dataset
+
+DATASET_PATH = "Ad Script Dataset.xlsx"
+
+
+def _time(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    snapshot_dir = tempfile.mkdtemp(prefix="lekhai_snapshot_")
+    build_snapshot(DATASET_PATH, snapshot_dir)
+
+    results = {
+        "read_excel + clean": _time(lambda: clean_dataset(read_dataset(DATASET_PATH)), args.repeats),
+        "snapshot (hash + parquet)": _time(lambda: load_corpus(DATASET_PATH, snapshot_dir), args.repeats),
+    }
+
+    print(f"\n{'path':<28}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for name, samples in results.items():
+        print(f"{name:<28}{statistics.median(samples):>12.1f}{min(samples):>10.1f}{max(samples):>10.1f}")
+    speedup = statistics.median(results["read_excel + clean"]) / statistics.median(results["snapshot (hash + parquet)"])
+    print(f"\nSnapshot speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
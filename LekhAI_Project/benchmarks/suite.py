@@ -0,0 +1,286 @@
+"""
+Retrieval benchmark suite — quality of search_vectors and smart_retrieve variants on labeled queries
+built from the dataset, plus latency and memory at synthetic corpus scales. Emits one JSON document
+so runs can be diffed over time.
+
+Labeled queries: every brief (prompt_1..3) is a query; the script it was written for is left out
+of the results, and the other scripts are judged by their industry / tone columns:
+    search_vectors   gain = same industry + shares a tone (0..2); relevant = gain 2, nDCG graded
+    smart_retrieve   industry_refs judged on same industry, tone_refs on a shared tone
+smart_retrieve variants mirror retrieve_reference_sets. "unlabeled" passes no filters (the
+classification fallback) and is the quality number. "labeled" passes the script's own industry /
+tones / product (as the UI's selections do) and is then judged on those same labels, so its recall
+is close to 1 by construction: it is reported under smart_retrieve_sanity, as a check that the
+metadata filter works, not as retrieval quality.
+Latencies cover retrieval only; queries are encoded once up front.
+
+Scales replicate the chunk embeddings with Gaussian perturbation (--noise, relative to unit norm)
+and report build time, index memory (RSS growth while building, so native HNSW memory counts)
+and p50/p99 latency per query.
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.suite [--k 5] [--scales 1 10 100] [--output results.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.metrics import latency_summary, score_ranking, summarize
+from utils.ann_index import ANN_THRESHOLD
+from utils.corpus import file_sha256, load_corpus
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import load_embeddings, normalize_rows
+from utils.encoders import DEFAULT_MODEL, ENCODER_BACKEND, load_encoder
+from utils.lexical_index import RRF_DEPTH, RRF_K
+from utils.memory import rss_mb
+from utils.mmr import MMR_LAMBDA, MMR_POOL
+from utils.quantized import EMBED_STORAGE, RESCORE_DEPTH
+from utils.scene_chunks import CHUNK_AGGREGATION, CHUNK_MAX_CHARS, CHUNK_TOP_N, scene_chunks
+
+DATASET_PATH = "Ad Script Dataset.xlsx"
+FILTER_MIN_ROWS = int(os.getenv("LEKHAI_FILTER_MIN_ROWS", "5"))  # as in inference_engine
+REFERENCE_SIZES = (3, 2)  # industry_refs, tone_refs
+
+
+class Labels:
+    """Per-row industry / tone labels and the relevance of every row to a query row."""
+
+    def __init__(self, df):
+        self.industry = df["industry"].astype(str).to_numpy()
+        self.tone_1 = df["tone_1"].astype(str).to_numpy()
+        self.tone_2 = df["tone_2"].astype(str).to_numpy()
+        self.product = df["product"].astype(str).tolist()
+
+    def tones(self, row) -> list:
+        return [t for t in (self.tone_1[row], self.tone_2[row]) if t]
+
+    def industry_gains(self, row) -> np.ndarray:
+        gains = (self.industry == self.industry[row]).astype(np.int32)
+        gains[row] = 0
+        return gains
+
+    def tone_gains(self, row) -> np.ndarray:
+        tones = self.tones(row)
+        gains = (np.isin(self.tone_1, tones) | np.isin(self.tone_2, tones)).astype(np.int32)
+        gains[row] = 0
+        return gains
+
+
+def labeled_queries(df):
+    """[(brief, source row), ...] for every non-empty prompt_1..3."""
+    queries = []
+    for row_id, prompts in enumerate(df[["prompt_1", "prompt_2", "prompt_3"]].itertuples(index=False)):
+        queries.extend((p[:300], row_id) for p in prompts if isinstance(p, str) and p.strip())
+    return queries
+
+
+def _timed(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t) * 1000
+
+
+def eval_search_vectors(index, labels, queries, query_vecs, k, mode):
+    scored, latencies = [], []
+    for (text, row), vec in zip(queries, query_vecs):
+        (top, _), ms = _timed(lambda: index.top_k(vec, k + 1, text if mode == "hybrid" else None))
+        latencies.append(ms)
+        ranked = [r for r in top.tolist() if r != row][:k]
+        scored.append(score_ranking(ranked, labels.industry_gains(row) + labels.tone_gains(row), k, min_gain=2))
+    return {"quality": summarize(scored, k), "latency": latency_summary(latencies)}
+
+
+def reference_queries(queries, labels, labeled):
+    """The industry and tone query texts retrieve_reference_sets builds for each brief."""
+    texts = []
+    for text, row in queries:
+        industry, tones = (labels.industry[row], labels.tones(row)) if labeled else ("", [])
+        texts.extend([f"{industry} {text}", f"{' '.join(tones)} {text}"])
+    return texts
+
+
+def run_reference_sets(index, labels, row, vecs, texts, labeled, lambda_, mode):
+    if labeled:
+        priorities = [index.meta.priority([labels.product[row]], labels.industry[row], None),
+                      index.meta.priority(None, None, labels.tones(row))]
+    else:
+        # No filter matches: the whole-corpus fallback (top_k, HNSW / compact storage at scale)
+        priorities = [np.zeros(len(index), dtype=np.int32)] * 2
+    return index.reference_sets(vecs, priorities, REFERENCE_SIZES, texts if mode == "hybrid" else None,
+                                min_rows=FILTER_MIN_ROWS, lambda_=lambda_, exclude=[row])
+
+
+def eval_smart_retrieve(index, labels, queries, ref_vecs, ref_texts, labeled, lambda_, mode):
+    industry_scored, tone_scored, similarity, latencies = [], [], [], []
+    for i, (_, row) in enumerate(queries):
+        vecs, texts = ref_vecs[2 * i:2 * i + 2], ref_texts[2 * i:2 * i + 2]
+        sets, ms = _timed(lambda: run_reference_sets(index, labels, row, vecs, texts, labeled, lambda_, mode))
+        latencies.append(ms)
+        (industry_rows, _, _), (tone_rows, _, _) = sets
+        industry_scored.append(score_ranking(industry_rows, labels.industry_gains(row), REFERENCE_SIZES[0]))
+        tone_scored.append(score_ranking(tone_rows, labels.tone_gains(row), REFERENCE_SIZES[1]))
+        # Intra-list similarity of all picked references (lower = more diverse)
+        centroids = index.script_centroids(np.concatenate([industry_rows, tone_rows]))
+        pairs = centroids @ centroids.T
+        similarity.append(pairs[np.triu_indices(len(pairs), 1)].mean())
+    return {
+        "industry_refs": summarize(industry_scored, REFERENCE_SIZES[0]),
+        "tone_refs": summarize(tone_scored, REFERENCE_SIZES[1]),
+        "intra_list_similarity": round(float(np.mean(similarity)), 4),
+        "latency": latency_summary(latencies),
+    }
+
+
+def scaled_corpus(df, embeddings, offsets, factor, noise, seed=0):
+    """The corpus replicated `factor` times; every copy after the first is a perturbed one."""
+    rng = np.random.default_rng(seed)
+    dim = embeddings.shape[1]
+    copies = [embeddings] + [
+        normalize_rows(embeddings + (noise / np.sqrt(dim)) * rng.standard_normal(embeddings.shape, dtype=np.float32))
+        for _ in range(factor - 1)
+    ]
+    scaled_offsets = np.concatenate([offsets[:1]] + [offsets[1:] + c * offsets[-1] for c in range(factor)])
+    return pd.concat([df] * factor, ignore_index=True), np.vstack(copies), scaled_offsets
+
+
+def eval_scale(df, embeddings, offsets, factor, noise, queries, query_vecs, ref_vecs, ref_texts, k):
+    frame, matrix, scaled_offsets = scaled_corpus(df, embeddings, offsets, factor, noise)
+    rss_before = rss_mb()
+    index, build_ms = _timed(lambda: CorpusIndex(frame, matrix, chunk_offsets=scaled_offsets))
+    rss_after = rss_mb()
+    labels = Labels(frame)
+    desc = index.describe()
+    report = {
+        "factor": factor,
+        "scripts": desc["rows"],
+        "chunks": desc["chunks"],
+        "search": desc["search"],
+        "storage": desc["storage"],
+        "build_s": round(build_ms / 1000, 3),
+        "embeddings_mb": desc["float32_mb"],
+        "first_pass_mb": desc["first_pass_mb"],
+        "index_rss_mb": round(rss_after - rss_before, 2),
+    }
+    for mode in ("dense", "hybrid"):
+        latencies = [_timed(lambda: index.top_k(vec, k, text if mode == "hybrid" else None))[1]
+                     for (text, _), vec in zip(queries, query_vecs)]
+        report[f"search_vectors_{mode}"] = latency_summary(latencies)
+    latencies = [
+        _timed(lambda: run_reference_sets(index, labels, row, ref_vecs[2 * i:2 * i + 2],
+                                          ref_texts[2 * i:2 * i + 2], True, MMR_LAMBDA, "hybrid"))[1]
+        for i, (_, row) in enumerate(queries)
+    ]
+    report["smart_retrieve_hybrid"] = latency_summary(latencies)
+    return report
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(args.backend, args.model)
+    chunk_texts, offsets = scene_chunks(df)
+    embeddings = np.asarray(load_embeddings(encoder.cache_key, chunk_texts, encoder.encode))
+    labels = Labels(df)
+    queries = labeled_queries(df)
+    query_vecs = encoder.encode([text for text, _ in queries])
+    ref_texts = {labeled: reference_queries(queries, labels, labeled) for labeled in (True, False)}
+    ref_vecs = {labeled: encoder.encode(texts) for labeled, texts in ref_texts.items()}
+
+    report = {
+        "run": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "dataset_sha256": file_sha256(DATASET_PATH),
+            "backend": args.backend,
+            "model": args.model,
+            "dim": int(embeddings.shape[1]),
+            "scripts": len(df),
+            "chunks": len(embeddings),
+            "queries": len(queries),
+            "k": args.k,
+        },
+        "config": {
+            "chunk_max_chars": CHUNK_MAX_CHARS,
+            "chunk_aggregation": CHUNK_AGGREGATION,
+            "chunk_top_n": CHUNK_TOP_N,
+            "rrf_k": RRF_K,
+            "rrf_depth": RRF_DEPTH,
+            "rescore_depth": RESCORE_DEPTH,
+            "ann_threshold": ANN_THRESHOLD,
+            "mmr_pool": MMR_POOL,
+            "filter_min_rows": FILTER_MIN_ROWS,
+            "noise": args.noise,
+        },
+        "search_vectors": {},
+        "smart_retrieve": {},
+        "smart_retrieve_sanity": {
+            "note": "filters on the query script's own labels and is judged on the same labels: checks "
+                    "the metadata filter, not retrieval quality",
+        },
+        "scales": [],
+    }
+
+    for storage in args.storage:
+        index = CorpusIndex(df, embeddings, chunk_offsets=offsets, storage=storage)
+        for mode in ("dense", "hybrid"):
+            report["search_vectors"][f"{mode}/{storage}"] = eval_search_vectors(
+                index, labels, queries, query_vecs, args.k, mode)
+
+    index = CorpusIndex(df, embeddings, chunk_offsets=offsets, storage=EMBED_STORAGE)
+    for mode in ("dense", "hybrid"):
+        for labeled in (True, False):
+            for lambda_ in args.mmr_lambdas:
+                name = f"{mode}/{'labeled' if labeled else 'unlabeled'}/lambda={lambda_:g}"
+                section = "smart_retrieve_sanity" if labeled else "smart_retrieve"
+                report[section][name] = eval_smart_retrieve(
+                    index, labels, queries, ref_vecs[labeled], ref_texts[labeled], labeled, lambda_, mode)
+
+    sample = slice(0, args.latency_queries)
+    for factor in args.scales:
+        print(f"[INFO] Scale x{factor}...")
+        report["scales"].append(eval_scale(
+            df, embeddings, offsets, factor, args.noise, queries[sample], query_vecs[sample],
+            ref_vecs[True][2 * sample.start:2 * sample.stop], ref_texts[True][2 * sample.start:2 * sample.stop], args.k))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--storage", nargs="+", default=["float32", "int8"], choices=["float32", "float16", "int8"])
+    parser.add_argument("--mmr-lambdas", type=float, nargs="+", default=sorted({1.0, MMR_LAMBDA}))
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--noise", type=float, default=0.1, help="perturbation norm of replicated embeddings")
+    parser.add_argument("--latency-queries", type=int, default=100)
+    parser.add_argument("--backend", default=ENCODER_BACKEND)
+    parser.add_argument("--model", default=os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL))
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):  # keep stdout pure JSON
+        report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[INFO] Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
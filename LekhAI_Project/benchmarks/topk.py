@@ -0,0 +1,69 @@
+"""
+Top-k benchmark — the original search_vectors hot path (full argsort + per-row df.iloc) vs. the
+argpartition top-k with results built from CorpusIndex's pre-extracted columns, at growing corpus sizes.
+
+Usage (from LekhAI_Project/):
+    python -m benchmarks.topk [--sizes 1000 10000 100000 500000] [--queries 200] [--k 5]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.ann import _latencies, synthetic_corpus
+from utils.corpus_index import CorpusIndex
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    industries = ["FMCG", "Real Estate", "Tech", "Fashion", "Banking"]
+    tones = ["Emotional", "Energetic", "Humorous", "Informative"]
+    return pd.DataFrame({
+        "script": [f"| visual {i} | audio {i} |" for i in range(n)],
+        "industry": pd.Categorical(rng.choice(industries, n)),
+        "tone": pd.Categorical(rng.choice(tones, n)),
+        "product": [f"Product {i % 977}" for i in range(n)],
+    })
+
+
+def legacy_search(df, embeddings, query_vec, top_k):
+    """search_vectors before this change."""
+    scores = np.dot(embeddings, query_vec)
+    top_indices = np.argsort(scores)[::-1][:top_k]
+    results = []
+    for idx in top_indices:
+        row = df.iloc[idx]
+        results.append({
+            "script": row['script'],
+            "metadata": {"industry": row['industry'], "tone": row['tone'], "product": row['product']},
+            "score": float(scores[idx]),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 500_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'argsort+iloc p50':>18}{'argpartition p50':>18}{'speedup':>9}  (ms)")
+    for n in args.sizes:
+        df, embeddings = synthetic_frame(n), synthetic_corpus(n)
+        index = CorpusIndex(df, embeddings, ann_threshold=n + 1)  # exact path on both sides
+        queries = synthetic_corpus(args.queries, seed=n + 1)
+
+        q = queries[0]
+        legacy = legacy_search(df, embeddings, q, args.k)
+        fast = index.results(*index.top_k(q, args.k))
+        assert [r["script"] for r in legacy] == [r["script"] for r in fast], "result mismatch"
+
+        old_p50, _ = _latencies(lambda q: legacy_search(df, embeddings, q, args.k), queries)
+        new_p50, _ = _latencies(lambda q: index.results(*index.top_k(q, args.k)), queries)
+        print(f"{n:>10}{old_p50:>18.3f}{new_p50:>18.3f}{old_p50 / new_p50:>8.1f}x")
+        del df, embeddings, index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+One-time corpus index builder for multi-worker serving.
+
+Writes the cleaned corpus snapshot and the normalized scene-chunk embedding matrix to data/cache/,
+which workers started with LEKHAI_SERVING_MODE=mmap attach to read-only (no per-worker
+encoding, one copy of the matrix in the page cache for all workers).
+
+Usage: python build_index.py
+"""
+import time
+
+from inference_engine import DATASET_PATH, EMBED_MODEL_NAME
+from utils.corpus import load_corpus
+from utils.embedding_cache import load_embeddings
+from utils.encoders import ENCODER_BACKEND, load_encoder
+from utils.scene_chunks import scene_chunks
+
+if __name__ == "__main__":
+    start = time.time()
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(ENCODER_BACKEND, EMBED_MODEL_NAME)
+    chunk_texts, _ = scene_chunks(df)
+    matrix = load_embeddings(encoder.cache_key, chunk_texts, encoder.encode)
+    print(f"[SUCCESS] Published {matrix.shape[0]}x{matrix.shape[1]} scene-chunk embeddings for {len(df)} scripts "
+          f"({encoder.cache_key}) in {time.time() - start:.1f}s.")
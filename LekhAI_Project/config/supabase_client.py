@@ -15,6 +15,7 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("[WARN] Supabase credentials missing in .env")
     supabase: Client = None
+    supabase_admin = None
 else:
     try:
         # Initialize Supabase Client
@@ -0,0 +1,12 @@
+# Multi-worker serving: gunicorn -c gunicorn.conf.py app:app
+#
+#   LEKHAI_SERVING_MODE=preload  parent loads the corpus once, workers fork and share it copy-on-write
+#   LEKHAI_SERVING_MODE=mmap     run `python build_index.py` once; workers attach to the published matrix read-only
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = 120
+
+preload_app = os.getenv("LEKHAI_SERVING_MODE", "standalone").lower() == "preload"
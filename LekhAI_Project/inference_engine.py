@@ -1,16 +1,30 @@
 import os
+import re
 import time
 import json
 import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import numpy as np
-import google.genai as genai
 from google.genai import types
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 import sys
 from utils.web_search import get_web_context
-from utils.dialect_loader import get_dialect_examples, get_dialect_label
+from utils.dialect_loader import get_dialect_examples, get_dialect_label, preload_dialects
+from utils.embedding_cache import load_embeddings, attach_embeddings
+from utils.corpus import read_corpus, finish_corpus
+from utils.corpus_index import CorpusIndex
+from utils.scene_chunks import scene_chunks
+from utils.query_cache import query_cache
+from utils.hardware import use_local_llm
+from utils.encoders import ENCODER_BACKEND, encoder_cache_key, load_encoder
+from utils.gemini_clients import gemini_pool
+from utils.key_scheduler import KeyScheduler
+from utils.circuit_breaker import CircuitBreaker
+from utils.hedging import HedgePolicy, hedged
+from utils.script_sanitizer import StreamSanitizer, sanitize_script
+from utils.latency import LatencyWindow
 
 # Force UTF-8 for Windows console just in case
 try:
@@ -25,22 +39,31 @@ load_dotenv()
 # CONFIGURATION & HARDWARE CHECK
 # ==========================================
 DATASET_PATH = "Ad Script Dataset.xlsx"
+EMBED_MODEL_NAME = os.getenv("LEKHAI_EMBED_MODEL", "all-MiniLM-L6-v2")  # HF name or local model dir
+
+# Multi-worker serving:
+#   standalone — every process loads (and if needed encodes) the corpus itself
+#   preload    — the parent process loads the corpus before forking (gunicorn --preload); workers share it copy-on-write
+#   mmap       — workers attach read-only to the matrix published by build_index.py and never encode the corpus
+SERVING_MODE = os.getenv("LEKHAI_SERVING_MODE", "standalone").lower()
+
+# Warm-up after init (readiness waits for it): encoder, BLAS, regexes; optionally pre-open Gemini connections
+WARMUP_ENABLED = os.getenv("LEKHAI_WARMUP", "1").lower() not in ("0", "false", "no")
+WARMUP_CONNECTIONS = int(os.getenv("LEKHAI_WARMUP_CONNECTIONS", "0"))
+
+# hybrid — dense cosine + BM25 over the scripts, fused by reciprocal rank fusion; dense — cosine only
+RETRIEVAL_MODE = os.getenv("LEKHAI_RETRIEVAL", "hybrid").lower()
+
+# Blocking work of a request (retrieval, web search, DB writes) runs on this pool, off the event loop
+IO_THREADS = int(os.getenv("LEKHAI_IO_THREADS", "64"))
+
+# Filtered retrieval falls back to searching the whole corpus when fewer rows match the metadata filter
+FILTER_MIN_ROWS = int(os.getenv("LEKHAI_FILTER_MIN_ROWS", "5"))
 
 print("[INFO] LekhAI Inference Engine Starting (Lightweight Mode)...")
 
-# Hardware Check
-try:
-    import torch
-    HAS_GPU = torch.cuda.is_available()
-    if HAS_GPU:
-        vram = torch.cuda.get_device_properties(0).total_memory / 1e9
-        print(f"[INFO] GPU Detected: {torch.cuda.get_device_name(0)} ({vram:.1f} GB VRAM)")
-        USE_LOCAL_LLM = vram >= 5.0
-    else:
-        print("[WARN] No GPU detected. Running in CPU (Turbo) Mode.")
-        USE_LOCAL_LLM = False
-except:
-    USE_LOCAL_LLM = False
+# Hardware check is lazy (utils/hardware.py): torch is only imported when a
+# local-LLM or torch-backed embedding path is actually requested.
 
 # ==========================================
 # 1. SETUP GEMINI API (ROTATION)
@@ -72,146 +95,291 @@ main_key = os.getenv("GEMINI_API_KEY")
 if main_key and main_key not in tier1_keys and main_key not in tier2_keys:
     tier2_keys.append(main_key)
 
-tier1_clients = [genai.Client(api_key=k) for k in tier1_keys]
-tier2_clients = [genai.Client(api_key=k) for k in tier2_keys]
-dialect_clients = [genai.Client(api_key=k) for k in dialect_keys]
-
-print(f"[INFO] Tier 1 Keys (Gemini 2.5): {len(tier1_clients)}")
-print(f"[INFO] Tier 2 Keys (Gemini Flash): {len(tier2_clients)}")
-print(f"[INFO] Dialect Keys (Gemini 2.5): {len(dialect_clients)}")
-
-t1_idx = 0
-t2_idx = 0
-dialect_idx = 0
-
-def call_gemini_rotating(prompt):
-    global t1_idx, t2_idx
-    
+# Clients are built lazily per key by gemini_pool (utils/gemini_clients.py) and share
+# one keep-alive connection pool, so nothing is constructed here.
+def _init_gemini_clients():
+    print(f"[INFO] Tier 1 Keys (Gemini 2.5): {len(tier1_keys)}")
+    print(f"[INFO] Tier 2 Keys (Gemini Flash): {len(tier2_keys)}")
+    print(f"[INFO] Dialect Keys (Gemini 2.5): {len(dialect_keys)}")
+
+# 15s per-call timeout (HttpOptions takes milliseconds)
+GENERATION_CONFIG = types.GenerateContentConfig(temperature=0.7, http_options=types.HttpOptions(timeout=15_000))
+
+# Per-tier key schedulers: best available key first, cooling / exhausted keys skipped
+tier1_scheduler = KeyScheduler(tier1_keys, "tier1")
+tier2_scheduler = KeyScheduler(tier2_keys, "tier2")
+dialect_scheduler = KeyScheduler(dialect_keys, "dialect")
+
+# Per tier/model circuit breakers: a degraded tier is skipped outright until a probe succeeds
+tier1_breaker = CircuitBreaker("tier1/gemini-2.5-flash")
+tier2_breaker = CircuitBreaker("tier2/gemini-flash-latest")
+dialect_breaker = CircuitBreaker("dialect/gemini-2.5-flash")
+
+# Per-tier hedging of generation calls (LEKHAI_HEDGE=1): a slow call is raced by a duplicate on another key
+tier1_hedger = HedgePolicy("tier1")
+tier2_hedger = HedgePolicy("tier2")
+dialect_hedger = HedgePolicy("dialect")
+
+async def _send(scheduler, breaker, key, model, prompt):
+    """One generate_content call on `key`; reports the outcome to the key scheduler and the tier's breaker."""
+    start = time.monotonic()
+    try:
+        response = await gemini_pool.get_async(key).models.generate_content(
+            model=model,
+            contents=prompt,
+            config=GENERATION_CONFIG
+        )
+    except asyncio.CancelledError:  # lost a hedge race
+        scheduler.release(key)
+        breaker.release()
+        raise
+    except Exception as e:
+        scheduler.failure(key, e, time.monotonic() - start)
+        breaker.failure(e)
+        raise
+    scheduler.success(key, time.monotonic() - start)
+    breaker.success()
+    return response.text
+
+async def _call_tier(scheduler, breaker, model, prompt, hedger=None):
+    """
+    Tries each key of a tier at most once, best first. Returns the response text, or None if
+    every key failed or is cooling, or the tier's circuit is open. With a `hedger`, each attempt
+    may be raced by a duplicate on another untried key.
+    """
+    tried = set()
+
+    def launch_hedge():
+        if not breaker.allow():
+            return None
+        key = scheduler.acquire(exclude=tried)
+        if key is None:
+            breaker.release()
+            return None
+        tried.add(key)
+        return _send(scheduler, breaker, key, model, prompt)
+
+    while len(tried) < len(scheduler):
+        if not breaker.allow():
+            return None
+        key = scheduler.acquire(exclude=tried)
+        if key is None:
+            breaker.release()
+            return None
+        tried.add(key)
+        try:
+            if hedger is not None:
+                return await hedged(hedger, _send(scheduler, breaker, key, model, prompt), launch_hedge)
+            return await _send(scheduler, breaker, key, model, prompt)
+        except Exception:
+            continue
+    return None
+
+async def call_gemini_rotating(prompt, hedge=False):
+    """`hedge`: race slow calls with a duplicate (generation calls; see utils/hedging.py)."""
     # --- TIER 1: High Quality (Gemini 2.5 Flash) ---
-    if tier1_clients:
-        for _ in range(len(tier1_clients)):
-            client = tier1_clients[t1_idx % len(tier1_clients)]
-            t1_idx += 1
-            try:
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash", 
-                    contents=prompt,
-                    config=types.GenerateContentConfig(temperature=0.7, timeout=15) # 15s timeout
-                )
-                return response.text, None
-            except Exception as e:
-                if "429" in str(e) or "quota" in str(e).lower():
-                    continue
-                continue
-    
+    text = await _call_tier(tier1_scheduler, tier1_breaker, "gemini-2.5-flash", prompt, tier1_hedger if hedge else None)
+    if text is not None:
+        return text, None
+
     # --- TIER 2: High Quota Fallback (Gemini Flash Latest) ---
-    if tier2_clients:
-        for _ in range(len(tier2_clients)):
-            client = tier2_clients[t2_idx % len(tier2_clients)]
-            t2_idx += 1
-            try:
-                response = client.models.generate_content(
-                    model="gemini-flash-latest", 
-                    contents=prompt,
-                    config=types.GenerateContentConfig(temperature=0.7, timeout=15) # 15s timeout
-                )
-# ... inside call_gemini_dialect
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(temperature=0.7, timeout=15) # 15s timeout
-                )
-                return response.text, "AI quota exhausted, reverting to basic model"
-            except Exception as e:
-                 if "429" in str(e) or "quota" in str(e).lower():
-                    continue
-                 time.sleep(0.5)
+    text = await _call_tier(tier2_scheduler, tier2_breaker, "gemini-flash-latest", prompt, tier2_hedger if hedge else None)
+    if text is not None:
+        return text, "AI quota exhausted, reverting to basic model"
 
     return None, "AI quota exhausted for the day. Please come back at later."
 
 
-def call_gemini_dialect(prompt):
+async def call_gemini_dialect(prompt, hedge=False):
     """Dedicated Gemini call using dialect-specific keys (Tier 3: Keys 16-20)."""
-    global dialect_idx
-    
-    if dialect_clients:
-        for _ in range(len(dialect_clients)):
-            client = dialect_clients[dialect_idx % len(dialect_clients)]
-            dialect_idx += 1
-            try:
-                response = client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(temperature=0.7, timeout=15) # 15s timeout
-                )
-                return response.text, None
-            except Exception as e:
-                if "429" in str(e) or "quota" in str(e).lower():
-                    continue
-                continue
+    text = await _call_tier(dialect_scheduler, dialect_breaker, "gemini-2.5-flash", prompt, dialect_hedger if hedge else None)
+    if text is not None:
+        return text, None
     
     # Fallback to regular rotation if dialect keys are exhausted
-    return call_gemini_rotating(prompt)
+    return await call_gemini_rotating(prompt, hedge)
+
+async def _relay(scheduler, breaker, key, start, stream, first):
+    """Yields the text of each streamed chunk; the call's outcome is reported once the stream ends."""
+    outcome = None
+    try:
+        chunk = first
+        while chunk is not None:
+            if chunk.text:
+                yield chunk.text
+            chunk = await anext(stream, None)
+        outcome = True
+    except Exception as e:
+        outcome = e
+        raise
+    finally:
+        if outcome is True:
+            scheduler.success(key, time.monotonic() - start)
+            breaker.success()
+        elif outcome is None:  # abandoned: client went away or the output hit the length cap
+            scheduler.release(key)
+            breaker.release()
+        else:
+            scheduler.failure(key, outcome, time.monotonic() - start)
+            breaker.failure(outcome)
+        await stream.aclose()
+
+async def _open_stream(scheduler, breaker, model, prompt):
+    """
+    Streaming counterpart of _call_tier: tries each key at most once, best first, until one
+    yields its first chunk. Returns an async iterator of text chunks, or None. Only the first
+    chunk can fail over; once text has been relayed the stream stays on its key.
+    """
+    tried = set()
+    while len(tried) < len(scheduler):
+        if not breaker.allow():
+            return None
+        key = scheduler.acquire(exclude=tried)
+        if key is None:
+            breaker.release()
+            return None
+        tried.add(key)
+        start = time.monotonic()
+        try:
+            stream = await gemini_pool.get_async(key).models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=GENERATION_CONFIG
+            )
+            first = await anext(stream, None)
+        except asyncio.CancelledError:
+            scheduler.release(key)
+            breaker.release()
+            raise
+        except Exception as e:
+            scheduler.failure(key, e, time.monotonic() - start)
+            breaker.failure(e)
+            continue
+        return _relay(scheduler, breaker, key, start, stream, first)
+    return None
+
+async def stream_gemini_rotating(prompt):
+    """call_gemini_rotating, streamed: (async iterator of text chunks, warning); (None, warning) if every tier failed."""
+    stream = await _open_stream(tier1_scheduler, tier1_breaker, "gemini-2.5-flash", prompt)
+    if stream is not None:
+        return stream, None
+
+    stream = await _open_stream(tier2_scheduler, tier2_breaker, "gemini-flash-latest", prompt)
+    if stream is not None:
+        return stream, "AI quota exhausted, reverting to basic model"
+
+    return None, "AI quota exhausted for the day. Please come back at later."
+
+async def stream_gemini_dialect(prompt):
+    """call_gemini_dialect, streamed."""
+    stream = await _open_stream(dialect_scheduler, dialect_breaker, "gemini-2.5-flash", prompt)
+    if stream is not None:
+        return stream, None
+    return await stream_gemini_rotating(prompt)
+
+_io_pool = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="lekhai-io")
+
+async def run_blocking(fn, *args):
+    """Runs a blocking call on the IO pool so the event loop keeps serving other requests."""
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, fn, *args)
 
 # ==========================================
 # 2. SETUP VECTOR SEARCH (PANDAS + NUMPY)
 # ==========================================
-print("[INFO] Loading Dataset & Embeddings...")
-embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-
-df = pd.DataFrame()
-embeddings = None
-
-if os.path.exists(DATASET_PATH):
-    df = pd.read_excel(DATASET_PATH)
-    # Basic cleaning — columns are lowercase: script, industry, tone_1, tone_2, product, duration, type
-    df = df[df['script'].notna() & (df['script'].str.len() > 10)].copy()
-    df['industry'] = df['industry'].fillna('General')
-    df['tone_1'] = df['tone_1'].fillna('Neutral')
-    df['tone_2'] = df['tone_2'].fillna('')
-    df['product'] = df['product'].fillna('Unknown')
-    # Combined tone column for convenience
-    df['tone'] = df.apply(lambda r: (r['tone_1'] + (', ' + r['tone_2'] if r['tone_2'] else '')).strip(), axis=1)
-    
-    # Create search text
-    df['search_text'] = df['industry'] + " " + df['tone'] + " " + df['product'] + " " + df['script'].str[:200]
-    
-    print(f"[INFO] Generating embeddings for {len(df)} scripts...")
-    embeddings = embed_model.encode(df['search_text'].tolist(), show_progress_bar=False)
-    # Normalize for cosine similarity
-    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+embed_model = None
+# Published retrieval index (df + embeddings). Replaced as a whole by init and reload_corpus().
+corpus = CorpusIndex(pd.DataFrame(), None)
+_raw_corpus = None  # (frame, source_hash, cleaned) between the read and clean phases
+_staged_corpus = None  # (cleaned df, source_hash) waiting for its embeddings
+
+def _init_dataset_read():
+    global _raw_corpus
+    if os.path.exists(DATASET_PATH):
+        # Fresh Parquet snapshot (already cleaned) or the raw workbook rows
+        _raw_corpus = read_corpus(DATASET_PATH)
+    else:
+        print(f"[ERROR] Dataset {DATASET_PATH} not found!")
+
+def _init_dataset_clean():
+    global _raw_corpus, _staged_corpus
+    if _raw_corpus is None:
+        return
+    # Cleaned corpus (script, industry, tone_1, tone_2, tone, product, search_text, ...); no-op for a fresh snapshot
+    frame, source_hash, cleaned = _raw_corpus
+    _staged_corpus = (finish_corpus(frame, source_hash, cleaned), source_hash)
+    _raw_corpus = None
+
+def _init_embed_model():
+    global embed_model
+    if embed_model is None:
+        # torch / onnx / onnx-int8 (LEKHAI_ENCODER_BACKEND); torch is only imported by the torch backend
+        embed_model = load_encoder(ENCODER_BACKEND, EMBED_MODEL_NAME)
+    return embed_model
+
+def _corpus_embeddings(frame):
+    """
+    (scene-chunk embedding rows, chunk -> script offsets) for `frame` (attach-only in mmap serving mode).
+    Every scene of every script is searched, not just the first 200 characters.
+    """
+    cache_key = encoder_cache_key(ENCODER_BACKEND, EMBED_MODEL_NAME)
+    chunk_texts, offsets = scene_chunks(frame)
+    if SERVING_MODE == "mmap":
+        return attach_embeddings(cache_key, chunk_texts), offsets
+    # Cached on disk and memory-mapped (only changed chunks re-encoded).
+    # The encoder is only needed on a cache miss, so preload can run this before embed_model.
+    return load_embeddings(cache_key, chunk_texts, lambda texts: _init_embed_model().encode(texts)), offsets
+
+def _init_embeddings():
+    global corpus, _staged_corpus
+    if _staged_corpus is None or len(_staged_corpus[0]) == 0:
+        return
+    frame, source_hash = _staged_corpus
+    print(f"[INFO] Loading embeddings for {len(frame)} scripts...")
+    embeddings, offsets = _corpus_embeddings(frame)
+    corpus = CorpusIndex(frame, embeddings, source_hash, chunk_offsets=offsets)
+    _staged_corpus = None
     print("[INFO] Embeddings ready.")
-else:
-    print(f"[ERROR] Dataset {DATASET_PATH} not found!")
 
-def search_vectors(query, top_k=5):
-    if embeddings is None or len(df) == 0: return []
-    
-    query_vec = embed_model.encode([query])[0]
-    query_vec = query_vec / np.linalg.norm(query_vec)
+def search_vectors_batch(queries, top_k=5):
+    """
+    search_vectors for many queries: one batched encode for the cache misses, one matrix-matrix
+    product over the corpus and a per-row argpartition top-k. Returns one result list per query.
+    """
+    queries = list(queries)
+    index = corpus  # read once: a concurrent reload swaps the whole index, never half of it
+    if len(index) == 0 or not queries: return [[] for _ in queries]
     
-    # Cosine similarity
-    scores = np.dot(embeddings, query_vec)
-    top_indices = np.argsort(scores)[::-1][:top_k]
+    query_vecs = query_cache.get_many(queries, embed_model.encode)  # already L2-normalized
     
-    results = []
-    for idx in top_indices:
-        row = df.iloc[idx]
-        results.append({
-            "script": row['script'],
-            "metadata": {
-                "industry": row['industry'],
-                "tone": row['tone'],
-                "product": row['product']
-            },
-            "score": float(scores[idx])
-        })
-    return results
+    # HNSW for large corpora, otherwise exact cosine with an argpartition top-k; + BM25 in hybrid mode
+    hits = index.top_k_batch(query_vecs, top_k, queries if RETRIEVAL_MODE == "hybrid" else None)
+    return [index.results(top_indices, top_scores) for top_indices, top_scores in hits]
+
+def search_vectors(query, top_k=5):
+    return search_vectors_batch([query], top_k)[0]
+
+def retrieve_reference_sets(user_prompt, products=None, industry=None, tones=None, sizes=(3, 2)):
+    """
+    Industry-conditioned and tone-conditioned reference sets. Both queries are encoded in one
+    batched call; each set is then scored on its own, since a filtered set only scores its own
+    metadata candidates and a fallback set goes through the corpus-wide top-k (HNSW / compact).
+    Each set is ranked by its own metadata priority (product/industry weights vs. tone weights),
+    then diversified with MMR; no script appears in both sets.
+    Too few matching rows for a set -> that set is drawn from the whole corpus.
+    """
+    index = corpus
+    if len(index) == 0: return [[] for _ in sizes]
+    queries = [f"{industry or ''} {user_prompt}", f"{' '.join(tones or [])} {user_prompt}"]
+    query_vecs = query_cache.get_many(queries, embed_model.encode)
+    priorities = [index.meta.priority(products, industry, None), index.meta.priority(None, None, tones)]
+    sets = index.reference_sets(query_vecs, priorities, sizes, queries if RETRIEVAL_MODE == "hybrid" else None,
+                                min_rows=FILTER_MIN_ROWS)
+    return [index.results(rows, scores, priority) for rows, scores, priority in sets]
 
 # ==========================================
 # 3. SMART RETRIEVAL LOGIC
 # ==========================================
-def smart_retrieve(user_prompt, product_name=None, selected_industry=None, selected_tones=None):
+async def smart_retrieve(user_prompt, product_name=None, selected_industry=None, selected_tones=None):
     # Same logic but uses search_vectors instead of chroma
     clf_prompt = f"""Classify: "{user_prompt}" (Product: {product_name})
      Industries: Real Estate, FMCG, Tech, Fashion, Banking
@@ -219,24 +387,25 @@ def smart_retrieve(user_prompt, product_name=None, selected_industry=None, selec
      Return JSON: {{"matched_industry": "...", "matched_tones": ["..."]}}"""
     
     try:
-        clf_raw, _ = call_gemini_rotating(clf_prompt) # Ignore warning for classification
+        clf_raw, _ = await call_gemini_rotating(clf_prompt) # Ignore warning for classification
         clf = json.loads(clf_raw.replace("```json", "").replace("```", "").strip())
     except:
         clf = {"matched_industry": "General", "matched_tones": []}
 
     target_ind = selected_industry or clf.get("matched_industry", "")
-    target_tone = " ".join(selected_tones or clf.get("matched_tones", []))
+    target_tones = selected_tones or clf.get("matched_tones", [])
     
-    query = f"{target_ind} {target_tone} {user_prompt}"
-    refs = search_vectors(query, top_k=5)
+    products = [product_name] if product_name and not product_name.startswith("[") else []  # skip "[Brand]" placeholder
+    industry_refs, tone_refs = await run_blocking(retrieve_reference_sets, user_prompt, products, target_ind, target_tones)
     
     return {
-        "references": {"industry_refs": refs[:3], "tone_refs": refs[3:]},
+        "references": {"industry_refs": industry_refs, "tone_refs": tone_refs},
         "classification": clf
     }
 
 def build_turbo_prompt(product, industry, tone, duration_str, ad_type, rag_refs, structure=None, web_context="", dialect=None):
-    refs_text = "\n".join([f"--- REF ({r['metadata']['industry']}) ---\n{r['script'][:600]}" for r in rag_refs.get("industry_refs", [])])
+    refs_text = "\n".join([f"--- REF ({r['metadata']['industry']}) ---\n{r['script'][:600]}" for r in rag_refs.get("industry_refs", [])]
+                          + [f"--- TONE REF ({r['metadata']['tone']}) ---\n{r['script'][:600]}" for r in rag_refs.get("tone_refs", [])])
     
     structure_instruction = ""
     if structure:
@@ -306,33 +475,41 @@ class SmartContext:
         
         return None
 
+    # Regex patterns for Brand/Product
+    PRODUCT_PATTERNS = [
+        r"brand\s+[:is]+\s*([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
+        r"product\s+[:is]+\s*([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
+        r"promote\s+([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
+        r"for\s+([A-Z][a-zA-Z0-9]+)"  # Capitalized word after 'for'
+    ]
+
     @staticmethod
-    def detect_product(prompt, existing_product=None):
-        """Extract product/brand name or return placeholder."""
-        if existing_product and existing_product.lower() not in ['none', 'null', '']:
-            return existing_product
-            
+    def match_product(prompt):
+        """Product/brand name named in the prompt by one of PRODUCT_PATTERNS, else None (no API call)."""
         import re
-        # Regex patterns for Brand/Product
-        patterns = [
-            r"brand\s+[:is]+\s*([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
-            r"product\s+[:is]+\s*([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
-            r"promote\s+([a-zA-Z0-9\s]+?)(?:[\.,]|$)",
-            r"for\s+([A-Z][a-zA-Z0-9]+)"  # Capitalized word after 'for'
-        ]
-        
-        for p in patterns:
+        for p in SmartContext.PRODUCT_PATTERNS:
             match = re.search(p, prompt, re.IGNORECASE)
             if match:
                 candidate = match.group(1).strip()
                 if len(candidate) > 2 and candidate.lower() not in ["a", "an", "the", "my"]:
                     return candidate
+        return None
+
+    @staticmethod
+    async def detect_product(prompt, existing_product=None):
+        """Extract product/brand name or return placeholder."""
+        if existing_product and existing_product.lower() not in ['none', 'null', '']:
+            return existing_product
+            
+        candidate = SmartContext.match_product(prompt)
+        if candidate:
+            return candidate
         
         # FALLBACK: Use Gemini to extract the main subject if Regex fails
         # This is cheap on Flash and ensures we don't miss "funny condom ad"
         try:
            extraction_prompt = f"Extract ONLY the main physical product or service from this request: '{prompt}'. Return ONLY the word. If none, return '[Brand]'."
-           extracted, _ = call_gemini_rotating(extraction_prompt)
+           extracted, _ = await call_gemini_rotating(extraction_prompt)
            if extracted and "[Brand]" not in extracted:
                return extracted.strip().replace("'", "").replace('"', "").replace(".", "")
         except:
@@ -361,36 +538,22 @@ class SmartContext:
 # ==========================================
 # 5. OUTPUT SANITIZER
 # ==========================================
-import re as _re
-
-def sanitize_script(text: str) -> str:
-    """Clean malformed Gemini output: collapse excessive whitespace, trim."""
-    if not text:
-        return text
-    # 1. Replace any sequence of 3+ newlines with exactly 2 (preserve paragraph breaks)
-    text = _re.sub(r'\n{3,}', '\n\n', text)
-    # 2. Collapse runs of identical non-alphanumeric characters (matches 50+ repetitions, reducing to 20)
-    #    This catches runaway hyphens, asterisks, dots, etc. often involved in infinite loops.
-    text = _re.sub(r'([^a-zA-Z0-9\s])\1{50,}', r'\1' * 20, text)
-    # 3. Remove trailing whitespace from each line
-    text = '\n'.join(line.rstrip() for line in text.split('\n'))
-    # 4. Strip leading/trailing whitespace from entire output
-    text = text.strip()
-    # 5. Hard cap: if output exceeds 8000 chars, truncate to last complete line
-    if len(text) > 8000:
-        text = text[:8000].rsplit('\n', 1)[0]
-        text += '\n\n---\n*(Script truncated for safety)*'
-    return text
+# sanitize_script (whole scripts) and StreamSanitizer (streamed chunks) live in utils/script_sanitizer.py
 
 # ==========================================
 # 6. ORCHESTRATOR
 # ==========================================
-def generate_lekhAI_script(prompt, product, industry=None, tones=None, duration="45s", ad_type="TVC", turbo=True, dialect=None):
-    start = time.time()
-    
+# Time-to-first-token is when the user first sees script text: the first streamed chunk, or the
+# whole response for /generate. It is the latency to watch; total time is kept alongside it.
+GENERATION_LATENCY = {
+    path: {"time_to_first_token": LatencyWindow(), "total": LatencyWindow()} for path in ("stream", "generate")
+}
+
+async def _prepare_generation(prompt, product, industry, tones, duration, ad_type, dialect):
+    """Everything before the Gemini call: smart context, retrieval, web context. Returns (final_prompt, retrieval)."""
     # 1. Smart Context: Duration & Product
     detected_sec = SmartContext.parse_duration(prompt)
-    smart_product = SmartContext.detect_product(prompt, product)
+    smart_product = await SmartContext.detect_product(prompt, product)
     
     structure = None
     if detected_sec:
@@ -403,12 +566,12 @@ def generate_lekhAI_script(prompt, product, industry=None, tones=None, duration=
     if dialect and dialect != "standard":
         print(f"[Dialect] Requested: {get_dialect_label(dialect)}")
 
-    retrieval = smart_retrieve(prompt, smart_product, industry, tones)
+    retrieval = await smart_retrieve(prompt, smart_product, industry, tones)
     clf = retrieval["classification"]
     
     # Web Context
     final_industry = industry or clf.get("matched_industry")
-    web_context = get_web_context(smart_product, final_industry)
+    web_context = await run_blocking(get_web_context, smart_product, final_industry)
     
     final_prompt = build_turbo_prompt(
         smart_product, final_industry, 
@@ -418,12 +581,28 @@ def generate_lekhAI_script(prompt, product, industry=None, tones=None, duration=
         web_context=web_context,
         dialect=dialect
     )
+    return final_prompt, retrieval
+
+def _result(script, warning, dialect, start, first_token, retrieval):
+    return {
+        "script": script,
+        "warning": warning,
+        "mode": "turbo_cpu" if not use_local_llm() else "turbo_manual",
+        "dialect": dialect or "standard",
+        "time": time.time() - start,
+        "time_to_first_token": first_token,
+        "details": retrieval
+    }
+
+async def generate_lekhAI_script(prompt, product, industry=None, tones=None, duration="45s", ad_type="TVC", turbo=True, dialect=None):
+    start = time.time()
+    final_prompt, retrieval = await _prepare_generation(prompt, product, industry, tones, duration, ad_type, dialect)
     
     # Use dedicated dialect keys if dialect is selected
     if dialect and dialect != "standard":
-        script, warning = call_gemini_dialect(final_prompt)
+        script, warning = await call_gemini_dialect(final_prompt, hedge=True)
     else:
-        script, warning = call_gemini_rotating(final_prompt)
+        script, warning = await call_gemini_rotating(final_prompt, hedge=True)
     
     if not script:
         script = warning
@@ -432,11 +611,254 @@ def generate_lekhAI_script(prompt, product, industry=None, tones=None, duration=
     # Sanitize output to prevent whitespace flooding
     script = sanitize_script(script)
 
+    elapsed = time.time() - start
+    GENERATION_LATENCY["generate"]["time_to_first_token"].record(elapsed)
+    GENERATION_LATENCY["generate"]["total"].record(elapsed)
+    return _result(script, warning, dialect, start, elapsed, retrieval)
+
+async def _text(text):
+    yield text
+
+async def stream_lekhAI_script(prompt, product, industry=None, tones=None, duration="45s", ad_type="TVC", turbo=True, dialect=None):
+    """
+    generate_lekhAI_script, streamed. Yields ("token", text) as Gemini writes the script (already
+    sanitized, see StreamSanitizer), then one ("done", result) with the same fields as
+    generate_lekhAI_script. Retrieval still runs before the first token.
+    """
+    start = time.time()
+    final_prompt, retrieval = await _prepare_generation(prompt, product, industry, tones, duration, ad_type, dialect)
+
+    if dialect and dialect != "standard":
+        stream, warning = await stream_gemini_dialect(final_prompt)
+    else:
+        stream, warning = await stream_gemini_rotating(final_prompt)
+
+    if stream is None:
+        stream = _text(warning)
+        warning = "CRITICAL_QUOTA_EXHAUSTED"
+
+    sanitizer = StreamSanitizer()
+    parts, first_token = [], None
+    try:
+        async for chunk in stream:
+            text = sanitizer.feed(chunk)
+            if text:
+                if first_token is None:
+                    first_token = time.time() - start
+                    GENERATION_LATENCY["stream"]["time_to_first_token"].record(first_token)
+                parts.append(text)
+                yield "token", text
+            if sanitizer.truncated:
+                break
+    except Exception as e:
+        print(f"[WARN] Gemini stream broke off: {e}")
+        warning = "Generation was interrupted, the script may be incomplete."
+    finally:
+        await stream.aclose()
+
+    text = sanitizer.finish()
+    if text:
+        parts.append(text)
+        yield "token", text
+
+    GENERATION_LATENCY["stream"]["total"].record(time.time() - start)
+    yield "done", _result("".join(parts), warning, dialect, start, first_token, retrieval)
+
+# ==========================================
+# 7. ENGINE INITIALIZATION (BACKGROUND)
+# ==========================================
+# Heavy state (Gemini clients, dataset, embedding model, embeddings, dialect data) is loaded
+# by initialize(), which app.py runs in a background thread after the server binds its port.
+WARMUP_QUERIES = [
+    "FMCG Humorous Write a funny ad for an orange ice cream",
+    "Real Estate & Construction Warm & Nostalgic 60 second TVC for a housing project in Dhaka",
+    "Financial Services Empowering mobile banking app ad",
+    "ঈদের জন্য একটি আবেগঘন বিজ্ঞাপন লিখুন",
+]
+
+def _warm_up():
+    """Pays the first-request costs up front: tokenizer/encoder init, first BLAS call, regex compilation, TLS."""
+    if not WARMUP_ENABLED:
+        print("[INFO] Warm-up disabled (LEKHAI_WARMUP=0).")
+        return
+    if embed_model is not None:
+        embed_model.encode(WARMUP_QUERIES)
+        for q in WARMUP_QUERIES:
+            embed_model.encode([q])
+    for q in WARMUP_QUERIES:
+        search_vectors(q, top_k=5)
+    sanitize_script("| Visual | Audio |\n\n\n\n| --- | --- |\n" + "-" * 80 + "   \n")
+    SmartContext.parse_duration("Write a 30 sec ad")
+    # Regexes only: detect_product would fall back to a Gemini call for anything they miss
+    for p in SmartContext.PRODUCT_PATTERNS:
+        re.compile(p, re.IGNORECASE)
+    SmartContext.match_product("brand is Warmup.")
+    if WARMUP_CONNECTIONS > 0:
+        # Connections belong to the serving event loop's pool, so they are opened on that loop
+        if _serving_loop is None:
+            print("[INFO] No serving event loop; skipping Gemini pre-connect.")
+        else:
+            opened = asyncio.run_coroutine_threadsafe(gemini_pool.preconnect(WARMUP_CONNECTIONS), _serving_loop).result(timeout=30)
+            print(f"[INFO] Pre-opened {opened} Gemini connection(s).")
+
+INIT_PHASES = [
+    ("gemini_clients", _init_gemini_clients),
+    ("dataset_read", _init_dataset_read),
+    ("dataset_clean", _init_dataset_clean),
+    ("embed_model", _init_embed_model),
+    ("embeddings", _init_embeddings),
+    ("dialects", preload_dialects),
+    ("warmup", _warm_up),
+]
+
+READINESS = {name: False for name, _ in INIT_PHASES}
+STARTUP_METRICS = {"state": "pending", "phases": {}, "total": None, "error": None}
+
+_init_lock = threading.Lock()
+_init_thread = None
+_serving_loop = None  # the server's event loop, captured by start_background_initialization()
+
+def initialize(phases=None):
+    """Runs init phases once (idempotent, blocking). Safe to call from scripts. `phases` limits which ones run."""
+    with _init_lock:
+        if STARTUP_METRICS["state"] == "ready":
+            return
+        STARTUP_METRICS["state"] = "initializing"
+        STARTUP_METRICS["error"] = None
+        print("[INFO] Loading Dataset & Embeddings...")
+        start = time.time()
+        for name, phase in INIT_PHASES:
+            if READINESS[name] or (phases is not None and name not in phases):
+                continue
+            t = time.time()
+            try:
+                phase()
+            except Exception as e:
+                STARTUP_METRICS["state"] = "failed"
+                STARTUP_METRICS["error"] = f"{name}: {e}"
+                print(f"[ERROR] Engine init phase '{name}' failed: {e}")
+                return
+            STARTUP_METRICS["phases"][name] = round(time.time() - t, 3)
+            READINESS[name] = True
+        STARTUP_METRICS["total"] = round((STARTUP_METRICS["total"] or 0) + time.time() - start, 3)
+        if not all(READINESS.values()):
+            STARTUP_METRICS["state"] = "partial"
+            return
+        STARTUP_METRICS["state"] = "ready"
+        print(f"[INFO] Engine ready in {STARTUP_METRICS['total']:.1f}s.")
+
+# Fork-safe phases: plain pandas/numpy state. Clients, thread pools and model runtimes are
+# built after the fork in each worker, because they don't survive fork() reliably.
+SHARED_PHASES = ["dataset_read", "dataset_clean", "embeddings", "dialects"]
+
+def preload_shared_state():
+    """Preload serving mode: load the corpus in the parent before workers fork, then freeze it."""
+    import gc
+    initialize(phases=SHARED_PHASES)
+    if embed_model is not None:
+        print("[WARN] Corpus had to be encoded in the parent. Run build_index.py before deploying.")
+    # Keep the GC from touching (and so copying) the preloaded objects in every worker
+    gc.collect()
+    gc.freeze()
+
+def start_background_initialization():
+    """Starts initialize() on a daemon thread (no-op if already started). Call from the server's event loop."""
+    global _init_thread, _serving_loop
+    try:
+        _serving_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _serving_loop = None
+    if STARTUP_METRICS["state"] == "ready" or (_init_thread is not None and _init_thread.is_alive()):
+        return
+    _init_thread = threading.Thread(target=initialize, name="lekhai-engine-init", daemon=True)
+    _init_thread.start()
+
+def is_retrieval_ready():
+    # embed_model too: in preload mode the parent marks "embeddings" ready before a worker has loaded its encoder
+    return READINESS["gemini_clients"] and READINESS["embed_model"] and READINESS["embeddings"]
+
+def get_metrics():
+    """Runtime metrics for /metrics."""
     return {
-        "script": script,
-        "warning": warning,
-        "mode": "turbo_cpu" if not USE_LOCAL_LLM else "turbo_manual",
-        "dialect": dialect or "standard",
-        "time": time.time() - start,
-        "details": retrieval
+        "generation_latency": {path: {kind: w.summary() for kind, w in windows.items()}
+                               for path, windows in GENERATION_LATENCY.items()},
+        "gemini_connections": gemini_pool.stats(),
+        "gemini_keys": {s.name: s.stats() for s in (tier1_scheduler, tier2_scheduler, dialect_scheduler)},
+        "gemini_circuits": {b.name: b.stats() for b in (tier1_breaker, tier2_breaker, dialect_breaker)},
+        "gemini_hedging": {h.name: h.stats() for h in (tier1_hedger, tier2_hedger, dialect_hedger)},
+        "query_embedding_cache": query_cache.stats(),
+        "corpus": dict(corpus.describe(), reload=dict(RELOAD_STATUS)),
+    }
+
+def get_readiness():
+    return {
+        "ready": STARTUP_METRICS["state"] == "ready",
+        "retrieval_ready": is_retrieval_ready(),
+        "state": STARTUP_METRICS["state"],
+        "components": dict(READINESS),
+        "startup_seconds": dict(STARTUP_METRICS["phases"], total=STARTUP_METRICS["total"]),
+        "error": STARTUP_METRICS["error"],
     }
+
+# ==========================================
+# 8. CORPUS HOT RELOAD
+# ==========================================
+# A new CorpusIndex is built off to the side (only new/changed rows are re-encoded, via the
+# embedding cache) and published with one reference assignment. In-flight searches keep the
+# index they already hold; the old one is freed once they finish. One reload runs at a time.
+CORPUS_WATCH_SECONDS = float(os.getenv("LEKHAI_CORPUS_WATCH_SECONDS", "0"))  # 0 = no file watcher
+
+RELOAD_STATUS = {"state": "idle", "started_at": None, "finished_at": None, "rows": None, "error": None}
+_reload_lock = threading.Lock()
+
+def reload_corpus(force=False):
+    """Rebuilds and swaps in the corpus index if the workbook changed. Returns True if swapped."""
+    global corpus
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    try:
+        RELOAD_STATUS.update(state="running", started_at=time.time(), error=None)
+        frame, source_hash, cleaned = read_corpus(DATASET_PATH)
+        if not force and source_hash == corpus.source_hash:
+            RELOAD_STATUS.update(state="idle", finished_at=time.time())
+            print("[INFO] Corpus unchanged, nothing to reload.")
+            return False
+
+        new_df = finish_corpus(frame, source_hash, cleaned)
+        embeddings, offsets = _corpus_embeddings(new_df)
+        new_index = CorpusIndex(new_df, embeddings, source_hash, chunk_offsets=offsets)
+        corpus = new_index  # atomic swap
+        RELOAD_STATUS.update(state="idle", finished_at=time.time(), rows=len(new_index))
+        print(f"[INFO] Corpus reloaded: {len(new_index)} scripts.")
+        return True
+    except Exception as e:
+        RELOAD_STATUS.update(state="failed", finished_at=time.time(), error=str(e))
+        print(f"[ERROR] Corpus reload failed: {e}")
+        return False
+    finally:
+        _reload_lock.release()
+
+def start_corpus_reload(force=False):
+    """Runs reload_corpus() on a background thread. Returns False if a reload is already running."""
+    if _reload_lock.locked() or not is_retrieval_ready():
+        return False
+    threading.Thread(target=reload_corpus, kwargs={"force": force}, name="lekhai-corpus-reload", daemon=True).start()
+    return True
+
+def _watch_corpus():
+    last_seen = None
+    while True:
+        time.sleep(CORPUS_WATCH_SECONDS)
+        try:
+            st = os.stat(DATASET_PATH)
+        except OSError:
+            continue
+        if last_seen is not None and (st.st_mtime, st.st_size) != last_seen and is_retrieval_ready():
+            print("[INFO] Dataset file changed on disk, reloading corpus...")
+            reload_corpus()
+        last_seen = (st.st_mtime, st.st_size)
+
+def start_corpus_watcher():
+    """Polls the workbook every LEKHAI_CORPUS_WATCH_SECONDS and reloads on change (disabled at 0)."""
+    if CORPUS_WATCH_SECONDS > 0:
+        threading.Thread(target=_watch_corpus, name="lekhai-corpus-watch", daemon=True).start()
@@ -0,0 +1,89 @@
+"""
+Startup phase profiler — imports and initializes the engine phase by phase and prints
+wall time and RSS delta for each, then exits non-zero if any phase is over budget.
+
+Usage:
+    python profile_startup.py
+    python profile_startup.py --budget embed_model=8 --budget embeddings=5 --default-budget 10
+    python profile_startup.py --cold          # empty cache dir: measures the full corpus encode
+
+Budgets can also come from LEKHAI_STARTUP_BUDGETS="import=3,embed_model=8".
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from utils.memory import rss_mb
+
+PHASE_LABELS = {
+    "import": "import inference_engine",
+    "gemini_clients": "Gemini client construction",
+    "dataset_read": "Dataset read",
+    "dataset_clean": "Cleaning",
+    "embed_model": "Embedding-model load",
+    "embeddings": "Corpus encoding",
+    "dialects": "Dialect data load",
+    "warmup": "Warm-up",
+}
+
+
+def parse_budgets(items):
+    budgets = {}
+    for item in items:
+        for pair in filter(None, item.split(",")):
+            name, _, seconds = pair.partition("=")
+            budgets[name.strip()] = float(seconds)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", action="append", default=[], metavar="PHASE=SECONDS",
+                        help="Per-phase wall-time budget (repeatable)")
+    parser.add_argument("--default-budget", type=float, default=None,
+                        help="Budget for phases without their own")
+    parser.add_argument("--cold", action="store_true",
+                        help="Use an empty cache dir so snapshot + embeddings are rebuilt")
+    args = parser.parse_args()
+
+    budgets = parse_budgets([os.getenv("LEKHAI_STARTUP_BUDGETS", "")] + args.budget)
+    if args.cold:
+        os.environ["LEKHAI_CACHE_DIR"] = tempfile.mkdtemp(prefix="lekhai_cold_")
+
+    rows = []
+    rss = rss_mb()
+    t = time.perf_counter()
+    import inference_engine
+    rows.append(("import", time.perf_counter() - t, rss_mb() - rss, True))
+
+    for name, _ in inference_engine.INIT_PHASES:
+        rss = rss_mb()
+        t = time.perf_counter()
+        inference_engine.initialize(phases=[name])
+        rows.append((name, time.perf_counter() - t, rss_mb() - rss, inference_engine.READINESS[name]))
+
+    print(f"\n{'phase':<28}{'wall s':>9}{'RSS Δ MB':>11}{'budget s':>10}  status")
+    failed = False
+    for name, seconds, rss_delta, ok in rows:
+        budget = budgets.get(name, args.default_budget)
+        if not ok:
+            status = "ERROR"
+        elif budget is not None and seconds > budget:
+            status = "OVER BUDGET"
+        else:
+            status = "ok"
+        failed = failed or status != "ok"
+        budget_str = f"{budget:.2f}" if budget is not None else "-"
+        print(f"{PHASE_LABELS.get(name, name):<28}{seconds:>9.3f}{rss_delta:>11.1f}{budget_str:>10}  {status}")
+
+    total = sum(r[1] for r in rows)
+    print(f"{'total':<28}{total:>9.3f}{rss_mb():>11.1f} (final RSS)")
+    if inference_engine.STARTUP_METRICS["error"]:
+        print(f"\n[ERROR] {inference_engine.STARTUP_METRICS['error']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
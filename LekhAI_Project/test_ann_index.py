@@ -0,0 +1,74 @@
+"""
+ANN index test: exact brute force is the ground truth; HNSW must match it closely above
+the size threshold and must not be used below it. Chunks crowded into one script must not cut
+a script search short.
+
+Run: python -m pytest test_ann_index.py   (or: python test_ann_index.py)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.ann import synthetic_corpus
+from utils.ann_index import build_ann_index, exact_top_k
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import normalize_rows
+
+K = 5
+
+
+def test_small_corpus_stays_exact():
+    assert build_ann_index(synthetic_corpus(200), threshold=1000) is None
+
+
+def test_hnsw_recall_against_exact():
+    corpus = synthetic_corpus(3000)
+    queries = synthetic_corpus(100, seed=7)
+    ann = build_ann_index(corpus, threshold=1000)
+    assert ann is not None, "hnswlib is required for this test"
+
+    truth, _ = exact_top_k(corpus, queries, K)
+    found, scores = ann.query(queries, K)
+    recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(truth, found)])
+    print(f"HNSW recall@{K} vs exact: {recall:.3f}")
+    assert recall >= 0.95
+    # Scores are cosine similarities, best first
+    np.testing.assert_allclose(scores[:, 0], np.einsum("ij,ij->i", queries, corpus[found[:, 0]]), atol=1e-4)
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)
+
+
+def test_concurrent_queries_only_raise_ef():
+    ann = build_ann_index(synthetic_corpus(2000), threshold=1000)
+    queries = synthetic_corpus(8, seed=3)
+    ks = [5, 80, 20, 150, 10, 120] * 20
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda k: ann.query(queries, k)[0], ks))
+    assert [r.shape for r in results] == [(8, k) for k in ks]
+    assert ann.ef_search == 150
+
+
+def test_chunks_crowded_into_one_script_still_give_k():
+    # Script 0 has 600 chunks right around the query; the other 400 scripts have one chunk each,
+    # so every one of the k * overfetch nearest chunks belongs to script 0
+    rng = np.random.default_rng(5)
+    query = normalize_rows(rng.standard_normal((1, 32)).astype(np.float32))[0]
+    crowd = normalize_rows(query + 0.01 * rng.standard_normal((600, 32)).astype(np.float32))
+    others = normalize_rows(rng.standard_normal((400, 32)).astype(np.float32))
+    offsets = np.concatenate([[0], 600 + np.arange(401)])
+    n = 401
+    df = pd.DataFrame({"script": [f"s{i}" for i in range(n)], "industry": [""] * n, "tone": [""] * n,
+                       "product": [""] * n})
+    index = CorpusIndex(df, np.vstack([crowd, others]), ann_threshold=100, chunk_offsets=offsets)
+    assert index.ann is not None
+    rows, scores = index.dense_top_k(query, K)
+    assert len(rows) == K and rows[0] == 0
+    np.testing.assert_allclose(scores, np.sort(index.script_scores(query))[::-1][:K], atol=1e-5)
+
+
+if __name__ == "__main__":
+    test_small_corpus_stays_exact()
+    test_hnsw_recall_against_exact()
+    test_concurrent_queries_only_raise_ef()
+    test_chunks_crowded_into_one_script_still_give_k()
+    print("[SUCCESS] ANN index matches exact search.")
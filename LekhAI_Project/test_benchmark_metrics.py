@@ -0,0 +1,39 @@
+"""
+Benchmark metric test: recall@k, reciprocal rank and nDCG@k on hand-computed rankings.
+
+Run: python -m pytest test_benchmark_metrics.py   (or: python test_benchmark_metrics.py)
+"""
+import numpy as np
+
+from benchmarks.metrics import score_ranking, summarize
+
+
+def test_perfect_and_empty_rankings():
+    gains = np.array([0, 2, 1, 0, 2])
+    perfect = score_ranking([1, 4, 2], gains, 3)
+    assert perfect == {"recall": 1.0, "rr": 1.0, "ndcg": 1.0}
+    miss = score_ranking([0, 3], gains, 2)
+    assert miss == {"recall": 0.0, "rr": 0.0, "ndcg": 0.0}
+    assert score_ranking([0, 1], np.zeros(5), 2) is None  # nothing relevant: skipped
+
+
+def test_hand_computed_values():
+    gains = np.array([0, 2, 1, 0, 2])
+    s = score_ranking([3, 2, 1], gains, 3, min_gain=2)
+    assert s["recall"] == 0.5  # one of min(3, 2) relevant rows
+    assert s["rr"] == 1 / 3
+    dcg = 1 / np.log2(3) + 3 / np.log2(4)
+    idcg = 3 + 3 / np.log2(3) + 1 / np.log2(4)
+    assert np.isclose(s["ndcg"], dcg / idcg)
+
+
+def test_summary_skips_unjudged_queries():
+    summary = summarize([{"recall": 1.0, "rr": 1.0, "ndcg": 1.0}, None, {"recall": 0.0, "rr": 0.5, "ndcg": 0.25}], 5)
+    assert summary == {"queries": 2, "k": 5, "recall": 0.5, "mrr": 0.75, "ndcg": 0.625}
+
+
+if __name__ == "__main__":
+    test_perfect_and_empty_rankings()
+    test_hand_computed_values()
+    test_summary_skips_unjudged_queries()
+    print("[SUCCESS] Benchmark metric checks passed.")
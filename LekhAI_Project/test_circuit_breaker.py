@@ -0,0 +1,86 @@
+"""
+Circuit breaker test: consecutive failures and error rate open the circuit, open rejects calls,
+half-open lets probes through and closes (or reopens with a longer cooldown), 429s and other 4xx
+never move it.
+
+Run: python -m pytest test_circuit_breaker.py   (or: python test_circuit_breaker.py)
+"""
+import time
+
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeApiError(Exception):
+    def __init__(self, code):
+        super().__init__(str(code))
+        self.code = code
+
+
+def call(breaker, outcome):
+    """One call through the breaker; outcome None = success, else the error it raised."""
+    assert breaker.allow()
+    if outcome is None:
+        breaker.success()
+    else:
+        breaker.failure(outcome)
+
+
+def test_consecutive_failures_open_and_probe_closes():
+    breaker = CircuitBreaker("t", failures=3, cooldown=0.1, probes=1)
+    for _ in range(2):
+        call(breaker, TimeoutError("read timeout"))
+    call(breaker, None)  # a success resets the streak
+    for _ in range(3):
+        call(breaker, FakeApiError(503))
+    assert breaker.state == OPEN
+    assert not breaker.allow() and breaker.stats()["rejected"] == 1
+
+    time.sleep(0.12)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    breaker = CircuitBreaker("t", failures=1, cooldown=0.05)
+    call(breaker, FakeApiError(500))
+    time.sleep(0.06)
+    call(breaker, FakeApiError(500))  # the probe
+    assert breaker.state == OPEN
+    time.sleep(0.06)
+    assert not breaker.allow()  # cooldown doubled to 0.1s
+    time.sleep(0.05)
+    assert breaker.allow()
+
+
+def test_error_rate_opens():
+    breaker = CircuitBreaker("t", failures=100, error_rate=0.5, window=10)
+    for i in range(9):
+        call(breaker, FakeApiError(500) if i % 2 else None)
+    assert breaker.state == CLOSED  # below the minimum sample
+    call(breaker, FakeApiError(500))
+    assert breaker.state == OPEN and breaker.stats()["error_rate"] == 0.5
+
+
+def test_quota_and_client_errors_are_neutral():
+    breaker = CircuitBreaker("t", failures=2, cooldown=0.05)
+    for _ in range(5):
+        call(breaker, FakeApiError(429))
+        call(breaker, FakeApiError(400))
+    assert breaker.state == CLOSED and breaker.stats()["failures"] == 0
+    # Neutral outcomes free the half-open probe slot
+    call(breaker, FakeApiError(500))
+    call(breaker, FakeApiError(500))
+    time.sleep(0.06)
+    call(breaker, FakeApiError(429))
+    assert breaker.state == HALF_OPEN and breaker.allow()
+
+
+if __name__ == "__main__":
+    test_consecutive_failures_open_and_probe_closes()
+    test_failed_probe_reopens_with_longer_cooldown()
+    test_error_rate_opens()
+    test_quota_and_client_errors_are_neutral()
+    print("[SUCCESS] Circuit breaker checks passed.")
@@ -0,0 +1,76 @@
+"""
+Parity test for the ONNX encoder backends against sentence-transformers (torch).
+
+- Cosine similarity between torch and ONNX embeddings must stay above PARITY_THRESHOLDS.
+- Top-k overlap against torch retrieval on the Ad Script Dataset is reported
+  (and must stay high for the fp32 export).
+
+Run: python -m pytest -s test_encoder_parity.py   (or: python test_encoder_parity.py)
+Set LEKHAI_EMBED_MODEL to a local model directory to run offline.
+"""
+import os
+import numpy as np
+
+from utils.corpus import load_corpus
+from utils.encoders import DEFAULT_MODEL, load_encoder
+
+MODEL_NAME = os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL)
+DATASET_PATH = "Ad Script Dataset.xlsx"
+PARITY_THRESHOLDS = {"onnx": 0.999, "onnx-int8": 0.97}
+MIN_FP32_TOPK_OVERLAP = 0.95
+TOP_K = 5
+
+_encoders = {}
+
+
+def _encoder(backend):
+    if backend not in _encoders:
+        _encoders[backend] = load_encoder(backend, MODEL_NAME)
+    return _encoders[backend]
+
+
+def _corpus_and_queries():
+    df = load_corpus(DATASET_PATH)
+    # Realistic briefs: the dataset's own user prompts, shaped like smart_retrieve's query
+    queries = (df['industry'].astype(str) + " " + df['tone'].astype(str) + " "
+               + df['prompt_1'].fillna(df['product']).str[:300]).tolist()
+    return df['search_text'].tolist(), queries
+
+
+def _topk(corpus_vecs, query_vecs, k):
+    scores = query_vecs @ corpus_vecs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def check_backend(backend):
+    corpus, queries = _corpus_and_queries()
+    ref_corpus = _encoder("torch").encode(corpus)
+    ref_queries = _encoder("torch").encode(queries)
+    cand_corpus = _encoder(backend).encode(corpus)
+    cand_queries = _encoder(backend).encode(queries)
+
+    cosines = np.concatenate([(ref_corpus * cand_corpus).sum(axis=1), (ref_queries * cand_queries).sum(axis=1)])
+    ref_top = _topk(ref_corpus, ref_queries, TOP_K)
+    cand_top = _topk(cand_corpus, cand_queries, TOP_K)
+    overlap = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(ref_top, cand_top)])
+
+    print(f"[{backend}] cosine vs torch: min={cosines.min():.5f} mean={cosines.mean():.5f} | "
+          f"top-{TOP_K} overlap on {len(queries)} queries: {overlap:.3f}")
+    return cosines.min(), overlap
+
+
+def test_onnx_fp32_parity():
+    min_cos, overlap = check_backend("onnx")
+    assert min_cos >= PARITY_THRESHOLDS["onnx"]
+    assert overlap >= MIN_FP32_TOPK_OVERLAP
+
+
+def test_onnx_int8_parity():
+    min_cos, _ = check_backend("onnx-int8")
+    assert min_cos >= PARITY_THRESHOLDS["onnx-int8"]
+
+
+if __name__ == "__main__":
+    test_onnx_fp32_parity()
+    test_onnx_int8_parity()
+    print("[SUCCESS] ONNX backends are within parity thresholds.")
@@ -1,4 +1,8 @@
-from inference_engine import SmartContext
+import asyncio
+
+from inference_engine import SmartContext, initialize
+
+initialize()
 
 test_prompts = [
     "Write a funny condom ad",
@@ -10,5 +14,5 @@ test_prompts = [
 
 print("Testing SmartContext.detect_product()...")
 for p in test_prompts:
-    detected = SmartContext.detect_product(p)
+    detected = asyncio.run(SmartContext.detect_product(p))
     print(f"Prompt: '{p}' -> Detected: '{detected}'")
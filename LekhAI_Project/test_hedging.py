@@ -0,0 +1,107 @@
+"""
+Hedged request test: a disabled policy is never touched, no hedge before enough latency samples,
+a slow primary is raced and the loser cancelled, the token budget caps hedges at the configured
+fraction, and failures fall through to the other call.
+
+Run: python -m pytest test_hedging.py   (or: python test_hedging.py)
+"""
+import asyncio
+
+from utils.hedging import HedgePolicy, hedged
+
+
+class Call:
+    """A fake Gemini call that returns (or raises) after `seconds` and remembers if it was cancelled."""
+
+    def __init__(self, seconds, result="ok", error=None):
+        self.seconds, self.result, self.error = seconds, result, error
+        self.cancelled = False
+
+    async def run(self):
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def warmed_policy(budget=1.0, latency=0.01):
+    policy = HedgePolicy("test", enabled=True, percentile=90, budget=budget, min_samples=5)
+    for _ in range(5):
+        policy.record(latency)
+    return policy
+
+
+def test_no_hedge_without_samples():
+    async def run():
+        policy = HedgePolicy("test", enabled=True, budget=1.0, min_samples=5)
+        hedge = Call(0.0, "hedge")
+        assert await hedged(policy, Call(0.05, "primary").run(), hedge.run) == "primary"
+        assert policy.stats()["hedges"] == 0
+    asyncio.run(run())
+
+
+def test_disabled_policy_is_untouched():
+    async def run():
+        policy = HedgePolicy("test", enabled=False, budget=1.0, min_samples=0)
+        hedge = Call(0.0, "hedge")
+        assert await hedged(policy, Call(0.05, "primary").run(), hedge.run) == "primary"
+        s = policy.stats()
+        assert s["primaries"] == 0 and s["hedges"] == 0 and s["tokens"] == 0 and s["latency_samples"] == 0
+    asyncio.run(run())
+
+
+def test_slow_primary_loses_to_hedge():
+    async def run():
+        policy = warmed_policy()
+        primary, hedge = Call(1.0, "primary"), Call(0.01, "hedge")
+        assert await hedged(policy, primary.run(), hedge.run) == "hedge"
+        await asyncio.sleep(0)
+        assert primary.cancelled
+        s = policy.stats()
+        assert s["hedges"] == 1 and s["hedge_wins"] == 1 and s["hedge_win_ratio"] == 1.0
+        # A fast primary never triggers a hedge
+        assert await hedged(policy, Call(0.0, "primary").run(), hedge.run) == "primary"
+        assert policy.stats()["hedges"] == 1
+    asyncio.run(run())
+
+
+def test_budget_caps_hedge_rate():
+    async def run():
+        policy = warmed_policy(budget=0.1, latency=0.001)
+        await asyncio.gather(*(hedged(policy, Call(0.02, "p").run(), Call(0.001, "h").run) for _ in range(100)))
+        s = policy.stats()
+        assert s["primaries"] == 100 and 0 < s["hedges"] <= 10
+        assert s["skipped_budget"] == 100 - s["hedges"]
+    asyncio.run(run())
+
+
+def test_failures_fall_through():
+    async def run():
+        policy = warmed_policy()
+        # Primary fails after the hedge went out: the hedge's answer is used
+        assert await hedged(policy, Call(0.05, error=RuntimeError("primary")).run(), Call(0.1, "hedge").run) == "hedge"
+        # Both fail: the primary's error propagates
+        try:
+            await hedged(policy, Call(0.05, error=RuntimeError("primary")).run(),
+                         Call(0.01, error=RuntimeError("hedge")).run)
+            assert False, "expected the primary's error"
+        except RuntimeError as e:
+            assert str(e) == "primary"
+        # No key for a hedge: the token is refunded and the primary is awaited
+        tokens = policy.stats()["tokens"]
+        assert await hedged(policy, Call(0.3, "primary").run(), lambda: None) == "primary"
+        assert policy.stats()["skipped_no_key"] == 1 and policy.stats()["tokens"] >= tokens
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_no_hedge_without_samples()
+    test_disabled_policy_is_untouched()
+    test_slow_primary_loses_to_hedge()
+    test_budget_caps_hedge_rate()
+    test_failures_fall_through()
+    print("[SUCCESS] Hedging checks passed.")
@@ -0,0 +1,44 @@
+"""
+Import-time regression test: `import app` must not pull in torch.
+
+torch (directly, or via sentence-transformers) is only allowed once a local-LLM or
+torch-backed embedding path is actually requested — see utils/hardware.py.
+
+Run: python -m pytest test_import_time.py   (or: python test_import_time.py)
+"""
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "transformers"]
+
+
+def _modules_loaded_by_import(module):
+    code = (
+        f"import sys, {module}; "
+        f"print('LOADED:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, encoding="utf-8", timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    line = next(l for l in out.stdout.splitlines() if l.startswith("LOADED:"))
+    return [m for m in line[len("LOADED:"):].split(",") if m]
+
+
+def test_import_app_does_not_import_torch():
+    loaded = _modules_loaded_by_import("app")
+    assert not loaded, f"`import app` pulled in heavy modules: {loaded}"
+
+
+def test_import_inference_engine_does_not_import_torch():
+    loaded = _modules_loaded_by_import("inference_engine")
+    assert not loaded, f"`import inference_engine` pulled in heavy modules: {loaded}"
+
+
+if __name__ == "__main__":
+    test_import_app_does_not_import_torch()
+    test_import_inference_engine_does_not_import_torch()
+    print("[SUCCESS] No torch on the import path.")
@@ -0,0 +1,127 @@
+"""
+Key scheduler test: fastest healthy key first, 429 cooldowns (Retry-After and RetryInfo delay)
+skip the key until they expire, per-day limits and quota estimates exhaust it, and counters stay
+consistent under concurrent use.
+
+Run: python -m pytest test_key_scheduler.py   (or: python test_key_scheduler.py)
+"""
+import threading
+import time
+
+from utils.key_scheduler import KeyScheduler, is_daily_limit, is_rate_limited, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeApiError(Exception):
+    def __init__(self, code, message, headers=None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.response = FakeResponse(headers or {})
+
+
+def rate_limit(delay=None, body=""):
+    return FakeApiError(429, f"RESOURCE_EXHAUSTED. {body}", {"retry-after": str(delay)} if delay is not None else {})
+
+
+def test_error_classification():
+    assert is_rate_limited(rate_limit()) and not is_rate_limited(FakeApiError(500, "INTERNAL"))
+    assert retry_after_seconds(rate_limit(12)) == 12.0
+    assert retry_after_seconds(rate_limit(body="{'@type': 'RetryInfo', 'retryDelay': '37s'}")) == 37.0
+    assert retry_after_seconds(rate_limit(body="Please retry in 4.5s.")) == 4.5
+    assert retry_after_seconds(rate_limit()) is None
+    assert is_daily_limit(rate_limit(body="quotaId: GenerateRequestsPerDayPerProjectPerModel-FreeTier"))
+    assert not is_daily_limit(rate_limit(body="quotaId: GenerateRequestsPerMinutePerProjectPerModel"))
+
+
+def test_prefers_fast_healthy_keys_and_rotates_equals():
+    scheduler = KeyScheduler(["a", "b", "c"], daily_quota=0)
+    # Fresh keys are handed out least recently used first
+    assert [scheduler.acquire() for _ in range(3)] == ["a", "b", "c"]
+    scheduler.success("a", 8.0)
+    scheduler.success("b", 0.5)
+    scheduler.failure("c", FakeApiError(500, "INTERNAL"), 0.5)
+    assert scheduler.acquire() == "b"
+    scheduler.success("b", 0.5)
+    # One failure costs less than a key 4x slower; excluded keys are skipped, not lost
+    assert scheduler.acquire(exclude={"b"}) == "c"
+    scheduler.success("c", 0.5)
+    assert scheduler.acquire(exclude={"b", "c"}) == "a"
+    scheduler.success("a", 8.0)
+    assert scheduler.acquire() == "b"
+
+
+def test_cooldown_skips_key_until_it_expires():
+    scheduler = KeyScheduler(["a", "b"], daily_quota=0)
+    key = scheduler.acquire()
+    scheduler.failure(key, rate_limit(0.2))
+    other = scheduler.acquire()
+    assert other != key
+    scheduler.failure(other, rate_limit(0.2))
+    assert scheduler.acquire() is None  # both cooling: no call is attempted
+    assert 0 < scheduler.next_ready_in() <= 0.2
+    assert scheduler.stats()["available"] == 0
+    time.sleep(0.25)
+    assert scheduler.acquire() in ("a", "b")
+
+
+def test_daily_limit_and_quota_estimate():
+    scheduler = KeyScheduler(["a", "b"], daily_quota=0)
+    for _ in range(3):
+        scheduler.acquire(exclude={"b"})
+        scheduler.success("a", 1.0)
+    scheduler.acquire(exclude={"b"})
+    scheduler.failure("a", rate_limit(body="GenerateRequestsPerDayPerProjectPerModel"))
+    stats = {k["key"]: k for k in scheduler.stats()["keys"]}
+    assert stats["keys-1"]["state"] == "exhausted" and stats["keys-1"]["quota_remaining"] == 0
+    assert stats["keys-1"]["cooldown_seconds"] > 0
+    assert [scheduler.acquire() for _ in range(2)] == ["b", "b"]
+
+    # Configured quota: the key retires itself once the estimate runs out, without a 429
+    scheduler = KeyScheduler(["a"], daily_quota=2)
+    for _ in range(2):
+        assert scheduler.acquire() == "a"
+        scheduler.success("a", 1.0)
+    assert scheduler.acquire() is None
+
+
+def test_thread_safety():
+    keys = [f"k{i}" for i in range(8)]
+    scheduler = KeyScheduler(keys, daily_quota=0)
+    acquired = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        for i in range(500):
+            key = scheduler.acquire()
+            if key is None:
+                continue
+            with lock:
+                acquired.append(key)
+            if (seed + i) % 7 == 0:
+                scheduler.failure(key, FakeApiError(500, "INTERNAL"), 0.01)
+            else:
+                scheduler.success(key, 0.01 * (1 + keys.index(key)))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = scheduler.stats()["keys"]
+    assert sum(k["calls"] for k in stats) == len(acquired) == 4000
+    assert all(k["in_flight"] == 0 for k in stats)
+    assert sum(k["successes"] + k["failures"] for k in stats) == len(acquired)
+    assert len(scheduler._ready) + len(scheduler._cooling) <= 4 * len(keys) + 64  # stale entries compacted
+
+
+if __name__ == "__main__":
+    test_error_classification()
+    test_prefers_fast_healthy_keys_and_rotates_equals()
+    test_cooldown_skips_key_until_it_expires()
+    test_daily_limit_and_quota_estimate()
+    test_thread_safety()
+    print("[SUCCESS] Key scheduler checks passed.")
@@ -0,0 +1,64 @@
+"""
+Lexical index test: Bangla-aware tokenization, BM25 scores against a per-document reference
+loop, and reciprocal rank fusion.
+
+Run: python -m pytest test_lexical_index.py   (or: python test_lexical_index.py)
+"""
+import math
+
+import numpy as np
+
+from utils.lexical_index import Bm25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    "| মা রান্নাঘরে। | অডিও: সন্তানের জন্য ক্ষমা চাই। |",
+    "বিকাশ-এ টাকা পাঠান bKash App দিয়ে।",
+    "উৎসবের দিনে সবাই একসাথে॥ Summer Dose আইসক্রিম",
+    "সন্তান সন্তান সন্তান — bKash",
+]
+
+
+def test_tokenizer_keeps_conjuncts_and_splits_on_dari():
+    assert tokenize("সন্তান ক্ষমা।মা") == ["সন্তান", "ক্ষমা", "মা"]
+    assert tokenize("বিকাশ-এ bKash App 5G॥") == ["বিকাশ", "এ", "bkash", "app", "5g"]
+    # ZWJ/ZWNJ variants and the ত্ + ZWJ spelling of khanda ta fold together
+    assert tokenize("উত\u09cd\u200dসব") == tokenize("উৎসব") == ["উৎসব"]
+    assert tokenize("ক\u09cd\u200cষ") == tokenize("ক্ষ")
+
+
+def _reference_bm25(docs, query, k1=1.5, b=0.75):
+    tokenized = [tokenize(d) for d in docs]
+    avg_len = sum(map(len, tokenized)) / len(docs)
+    scores = []
+    for doc in tokenized:
+        score = 0.0
+        for term in tokenize(query):
+            df = sum(term in d for d in tokenized)
+            if df == 0:
+                continue
+            tf = doc.count(term)
+            idf = math.log1p((len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return np.array(scores)
+
+
+def test_bm25_matches_reference():
+    index = Bm25Index(DOCS)
+    for query in ["সন্তান bkash", "bKash আইসক্রিম", "উত\u09cd\u200dসব", "nothing here"]:
+        np.testing.assert_allclose(index.scores(query), _reference_bm25(DOCS, query), rtol=1e-5, atol=1e-6)
+    top, _ = index.top_k("সন্তান", 5)
+    assert top.tolist() == [3]  # "সন্তানের" is a different term
+
+
+def test_reciprocal_rank_fusion():
+    ids, fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+    assert ids.tolist() == [1, 3, 2]
+    assert math.isclose(fused[0], 1 / 61 + 1 / 62)
+
+
+if __name__ == "__main__":
+    test_tokenizer_keeps_conjuncts_and_splits_on_dari()
+    test_bm25_matches_reference()
+    test_reciprocal_rank_fusion()
+    print("[SUCCESS] Lexical index checks passed.")
@@ -0,0 +1,54 @@
+"""
+Metadata priority test: the notebook's smart-retrieval weights — product exact 3 / partial 2 (per
+product), industry exact 2, first tone 2 / further tones 1 matched against tone_1 or tone_2 — and
+empty values (in the corpus or the request) never matching anything.
+
+Run: python -m pytest test_metadata_index.py   (or: python test_metadata_index.py)
+"""
+import numpy as np
+import pandas as pd
+
+from utils.metadata_index import MetadataIndex
+
+CORPUS = pd.DataFrame({
+    "industry": ["FMCG", "FMCG", "Tech", "", "fmcg "],
+    "tone_1": ["Humorous", "Emotional", "", "", "humorous"],
+    "tone_2": ["Emotional", "", "Humorous", "", ""],
+    "product": ["Pran Juice", "Pran", "Pran Juice Mango", "", None],
+})
+
+
+def test_notebook_weights():
+    index = MetadataIndex(CORPUS)
+    priority = index.priority(["Pran Juice"], "FMCG", ["Humorous", "Emotional"])
+    # row 0: product exact 3 + industry 2 + first tone (tone_1) 2 + second tone (tone_2) 1
+    # row 1: product partial 2 ("pran" inside "pran juice") + industry 2 + second tone 1
+    # row 2: product partial 2 (contains "pran juice") + first tone via tone_2 2
+    # row 3: nothing — its empty values match nothing
+    # row 4: industry 2 (case / spaces normalized) + first tone 2; missing product matches nothing
+    assert priority.tolist() == [8, 5, 4, 0, 4]
+
+
+def test_each_weight_alone():
+    index = MetadataIndex(CORPUS)
+    assert index.priority(["pran juice"]).tolist() == [3, 2, 2, 0, 0]
+    assert index.priority(industry="FMCG").tolist() == [2, 2, 0, 0, 2]
+    assert index.priority(tones=["Emotional"]).tolist() == [2, 2, 0, 0, 0]
+    assert index.priority(tones=["Humorous", "Emotional"]).tolist() == [3, 1, 2, 0, 2]
+    # Weights add up per requested product
+    assert index.priority(["Pran Juice", "Pran"]).tolist() == [3 + 2, 2 + 3, 2 + 2, 0, 0]
+
+
+def test_empty_request_values_match_nothing():
+    index = MetadataIndex(CORPUS)
+    assert not np.any(index.priority(["", "  "], "  ", ["", None]))
+    assert not np.any(index.priority())
+    # An empty request tone is skipped, so the next tone is the "first" one (weight 2)
+    assert index.priority(tones=["", "Emotional"]).tolist() == [2, 2, 0, 0, 0]
+
+
+if __name__ == "__main__":
+    test_notebook_weights()
+    test_each_weight_alone()
+    test_empty_request_values_match_nothing()
+    print("[SUCCESS] Metadata priority checks passed.")
@@ -0,0 +1,105 @@
+"""
+MMR / reference set test: vectorized MMR matches a naive nested-loop reference, near-duplicates
+are skipped, the industry / tone sets never share a script, metadata priority still counts inside
+the MMR pool, and a set without metadata matches is searched through the ANN path.
+
+Run: python -m pytest test_mmr.py   (or: python test_mmr.py)
+"""
+import numpy as np
+import pandas as pd
+
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import normalize_rows
+from utils.mmr import mmr_select
+
+
+def naive_mmr(relevance, vectors, k, lambda_):
+    picks = []
+    while len(picks) < k:
+        best, best_score = None, -np.inf
+        for i in range(len(relevance)):
+            if i in picks:
+                continue
+            redundancy = max((float(vectors[i] @ vectors[j]) for j in picks), default=0.0)
+            score = lambda_ * relevance[i] - (1 - lambda_) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        picks.append(best)
+    return picks
+
+
+def test_matches_naive_reference():
+    rng = np.random.default_rng(0)
+    for lambda_ in (0.3, 0.7, 1.0):
+        vectors = normalize_rows(rng.standard_normal((40, 16)).astype(np.float32))
+        relevance = rng.random(40).astype(np.float32)
+        assert mmr_select(relevance, vectors, 6, lambda_).tolist() == naive_mmr(relevance, vectors, 6, lambda_)
+
+
+def test_skips_near_duplicate():
+    vectors = normalize_rows(np.array([[1, 0, 0], [1, 0.01, 0], [0, 1, 0]], dtype=np.float32))
+    relevance = np.array([0.9, 0.89, 0.7], dtype=np.float32)
+    assert mmr_select(relevance, vectors, 2, lambda_=1.0).tolist() == [0, 1]
+    assert mmr_select(relevance, vectors, 2, lambda_=0.5).tolist() == [0, 2]
+    # Vectors chosen for an earlier set count as already selected
+    assert mmr_select(relevance, vectors, 1, lambda_=0.5, seen=vectors[:1]).tolist() == [2]
+
+
+def corpus_frame(n):
+    return pd.DataFrame({
+        "script": [f"script {i}" for i in range(n)],
+        "industry": ["FMCG" if i < 12 else "Tech" for i in range(n)],
+        "tone": ["Humorous" if i % 2 else "Emotional" for i in range(n)],
+        "tone_1": ["Humorous" if i % 2 else "Emotional" for i in range(n)],
+        "tone_2": [""] * n,
+        "product": [f"product {i}" for i in range(n)],
+    })
+
+
+def test_reference_sets_are_disjoint():
+    rng = np.random.default_rng(1)
+    n = 30
+    df = corpus_frame(n)
+    embeddings = normalize_rows(rng.standard_normal((n, 16)).astype(np.float32))
+    index = CorpusIndex(df, embeddings)
+    query = embeddings[3] + embeddings[5]
+    priorities = [index.meta.priority(None, "FMCG", None), index.meta.priority(None, None, ["Humorous"])]
+    (ind_rows, ind_scores, _), (tone_rows, _, _) = index.reference_sets(np.vstack([query, query]), priorities, (3, 2))
+    assert len(ind_rows) == 3 and len(tone_rows) == 2
+    assert not set(ind_rows.tolist()) & set(tone_rows.tolist())
+    assert all(df["industry"][i] == "FMCG" for i in ind_rows)
+    assert all(df["tone"][i] == "Humorous" for i in tone_rows)
+    assert np.allclose(ind_scores, embeddings[ind_rows] @ query, atol=1e-5)
+
+
+def test_priority_counts_inside_the_pool():
+    # Row 0 matches the product (priority 3), row 1 only the industry (priority 2) but is a bit closer
+    embeddings = normalize_rows(np.array([[0.8, 0.6, 0], [0.85, 0, 0.53], [0, 0, 1]], dtype=np.float32))
+    index = CorpusIndex(corpus_frame(3), embeddings)
+    query = np.array([1, 0, 0], dtype=np.float32)
+    (rows, _, _), = index.reference_sets(query, [np.array([3, 2, 0])], (1,), lambda_=1.0)
+    assert rows.tolist() == [0]
+
+
+def test_unfiltered_set_uses_the_ann_path():
+    rng = np.random.default_rng(2)
+    n = 200
+    embeddings = normalize_rows(rng.standard_normal((n, 16)).astype(np.float32))
+    index = CorpusIndex(corpus_frame(n), embeddings, ann_threshold=100)
+    assert index.ann is not None, "hnswlib is required for this test"
+    calls = []
+    query_ann = index.ann.query
+    index.ann.query = lambda vecs, k: calls.append(k) or query_ann(vecs, k)
+    no_match = np.zeros(n, dtype=np.int32)
+    (rows, scores, _), = index.reference_sets(embeddings[7], [no_match], (3,), exclude=[7])
+    assert calls and len(rows) == 3 and 7 not in rows.tolist()
+    assert np.allclose(scores, embeddings[rows] @ embeddings[7], atol=1e-5)
+
+
+if __name__ == "__main__":
+    test_matches_naive_reference()
+    test_skips_near_duplicate()
+    test_reference_sets_are_disjoint()
+    test_priority_counts_inside_the_pool()
+    test_unfiltered_set_uses_the_ann_path()
+    print("[SUCCESS] MMR reference set checks passed.")
@@ -0,0 +1,56 @@
+"""
+Quantized storage test: float16 and int8 first-pass scoring with float32 rescoring must return
+the same top-5 scripts as exact float32 search on the Ad Script Dataset.
+
+Run: python -m pytest -s test_quantized_search.py   (or: python test_quantized_search.py)
+Set LEKHAI_EMBED_MODEL to a local model directory to run offline.
+"""
+import os
+
+import numpy as np
+
+from utils.corpus import load_corpus
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import load_embeddings
+from utils.encoders import DEFAULT_MODEL, ENCODER_BACKEND, load_encoder
+from utils.scene_chunks import scene_chunks
+
+MODEL_NAME = os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL)
+DATASET_PATH = "Ad Script Dataset.xlsx"
+TOP_K = 5
+
+
+def _indexes_and_queries():
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(ENCODER_BACKEND, MODEL_NAME)
+    chunk_texts, offsets = scene_chunks(df)
+    embeddings = load_embeddings(encoder.cache_key, chunk_texts, encoder.encode)
+    indexes = {
+        storage: CorpusIndex(df, embeddings, chunk_offsets=offsets, ann_threshold=len(embeddings) + 1, storage=storage)
+        for storage in ("float32", "float16", "int8")
+    }
+    # The dataset's own briefs, shaped like smart_retrieve's query
+    queries = (df['industry'].astype(str) + " " + df['tone'].astype(str) + " "
+               + df['prompt_1'].fillna(df['product']).str[:300]).tolist()
+    return indexes, encoder.encode(queries)
+
+
+def test_quantized_top5_matches_exact():
+    indexes, query_vecs = _indexes_and_queries()
+    exact = indexes["float32"]
+    for storage in ("float16", "int8"):
+        index = indexes[storage]
+        for q in query_vecs:
+            want, want_scores = exact.dense_top_k(q, TOP_K)
+            got, got_scores = index.dense_top_k(q, TOP_K)
+            assert got.tolist() == want.tolist(), storage
+            np.testing.assert_allclose(got_scores, want_scores, atol=1e-6)  # rescored in float32
+        info = index.describe()
+        print(f"[{storage}] top-{TOP_K} identical on {len(query_vecs)} queries | "
+              f"{info['first_pass_mb']} MB first pass vs {info['float32_mb']} MB float32")
+        assert info["first_pass_mb"] < info["float32_mb"]
+
+
+if __name__ == "__main__":
+    test_quantized_top5_matches_exact()
+    print("[SUCCESS] Quantized search matches exact search.")
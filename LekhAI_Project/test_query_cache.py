@@ -0,0 +1,134 @@
+"""
+Query embedding cache test: key normalization, LRU eviction, TTL expiry and consistent
+counters under concurrent lookups; for get_many (the path retrieval uses) one encode call per
+batch, expiry, eviction, and a key repeated within a batch counted as one lookup.
+
+Run: python -m pytest test_query_cache.py   (or: python test_query_cache.py)
+"""
+import threading
+import time
+
+import numpy as np
+
+from utils.query_cache import QueryEmbeddingCache, normalize_query
+
+
+class CountingEncoder:
+    def __init__(self):
+        self.calls = 0
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def encode(self, texts):
+        with self.lock:
+            self.calls += 1
+            self.batches.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_normalization():
+    # NFC: ো written as ে + া, Latin case, whitespace runs
+    assert normalize_query("FMCG  Humorous\n\tকো") == normalize_query("fmcg humorous কো")
+    assert normalize_query("  Summer Dose  ") == "summer dose"
+
+
+def test_lru_eviction_and_counters():
+    cache, encoder = QueryEmbeddingCache(max_size=2), CountingEncoder()
+    for q in ["a", "b", "A", "c", "a"]:
+        cache.get(q, encoder.encode)
+    s = cache.stats()
+    # a miss, b miss, A hit (refreshes a), c miss (evicts b), a hit
+    assert (s["hits"], s["misses"], s["evictions"], s["size"]) == (2, 3, 1, 2)
+    assert encoder.calls == 3
+    cache.get("b", encoder.encode)
+    assert encoder.calls == 4
+
+
+def test_ttl_expiry():
+    cache, encoder = QueryEmbeddingCache(max_size=8, ttl=0.05), CountingEncoder()
+    cache.get("brief", encoder.encode)
+    cache.get("brief", encoder.encode)
+    time.sleep(0.1)
+    cache.get("brief", encoder.encode)
+    s = cache.stats()
+    assert (s["hits"], s["misses"], s["expirations"]) == (1, 2, 1)
+
+
+def test_thread_safety():
+    cache, encoder = QueryEmbeddingCache(max_size=16), CountingEncoder()
+    queries = [f"brief {i % 40}" for i in range(4000)]
+
+    def worker(offset):
+        for q in queries[offset::8]:
+            vec = cache.get(q, encoder.encode)
+            assert vec[0] == len(q)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    s = cache.stats()
+    assert s["hits"] + s["misses"] == len(queries)
+    assert s["misses"] == encoder.calls
+    assert s["size"] <= 16 and s["size"] + s["evictions"] <= s["misses"]  # racing misses share a slot
+
+
+def counters(cache):
+    s = cache.stats()
+    return s["hits"], s["misses"], s["evictions"], s["expirations"], s["size"]
+
+
+def test_get_many_encodes_all_misses_at_once():
+    cache, encoder = QueryEmbeddingCache(max_size=8), CountingEncoder()
+    cache.get("cached", encoder.encode)
+    vectors = cache.get_many(["one", "Cached", "three  words", "four"], encoder.encode)
+    # Only the misses, normalized and in order, in a single call
+    assert encoder.batches[1:] == [["one", "three words", "four"]]
+    assert vectors[:, 0].tolist() == [3, 6, 11, 4]
+    assert counters(cache) == (1, 4, 0, 0, 4)
+    cache.get_many(["one", "four"], encoder.encode)
+    assert encoder.calls == 2 and counters(cache)[:2] == (3, 4)
+
+
+def test_get_many_ttl_expiry():
+    cache, encoder = QueryEmbeddingCache(max_size=8, ttl=0.05), CountingEncoder()
+    cache.get_many(["brief", "other"], encoder.encode)
+    cache.get_many(["brief"], encoder.encode)
+    time.sleep(0.1)
+    cache.get_many(["brief", "other"], encoder.encode)
+    assert encoder.batches[-1] == ["brief", "other"]
+    assert counters(cache) == (1, 4, 0, 2, 2)
+
+
+def test_get_many_lru_eviction():
+    cache, encoder = QueryEmbeddingCache(max_size=2), CountingEncoder()
+    cache.get_many(["a", "b"], encoder.encode)
+    cache.get_many(["A", "c"], encoder.encode)  # a hit (refreshed), c miss evicts b
+    assert counters(cache) == (1, 3, 1, 0, 2)
+    cache.get_many(["b", "a"], encoder.encode)  # b miss evicts c; a still cached
+    assert encoder.batches[-1] == ["b"]
+    assert counters(cache) == (2, 4, 2, 0, 2)
+
+
+def test_get_many_repeated_key_is_one_lookup():
+    cache, encoder = QueryEmbeddingCache(max_size=8), CountingEncoder()
+    # An unclassified brief: both reference queries normalize to the same key
+    vectors = cache.get_many([" Tea ad", "tea  ad"], encoder.encode)
+    assert encoder.batches == [["tea ad"]] and len(vectors) == 2
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+    assert counters(cache)[:2] == (0, 1) and cache.stats()["hit_ratio"] == 0.0
+    cache.get_many(["tea ad", "TEA AD"], encoder.encode)
+    assert counters(cache)[:2] == (1, 1) and cache.stats()["hit_ratio"] == 0.5
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_lru_eviction_and_counters()
+    test_ttl_expiry()
+    test_thread_safety()
+    test_get_many_encodes_all_misses_at_once()
+    test_get_many_ttl_expiry()
+    test_get_many_lru_eviction()
+    test_get_many_repeated_key_is_one_lookup()
+    print("[SUCCESS] Query embedding cache checks passed.")
@@ -0,0 +1,65 @@
+"""
+Scene chunk test: markdown scripts split into scene chunks, and the vectorized segment
+reductions match a per-script loop.
+
+Run: python -m pytest test_scene_chunks.py   (or: python test_scene_chunks.py)
+"""
+import numpy as np
+
+from utils.scene_chunks import aggregate, split_scenes
+
+TABLE_SCRIPT = """## কনসেপ্ট: অতিথি
+
+**দৃশ্যপট:** সকালবেলা। বাড়িতে হইচই।
+
+| Scene Description | Audio/Dialogue |
+| :--- | :--- |
+| **Scene 1:** বাবা খুব টেনশনে। | **Baba:** ওগো শুনছো? <br> **Ma:** তুমিও না! |
+| **Scene 2:** মা বোতল এগিয়ে দেন। | **Ma:** দিন বদলাইছে না? |
+"""
+
+PROSE_SCRIPT = """## গল্পঃ গ্যাঞ্জাম
+
+গরমটা অসহনীয়।
+- চায়ের দোকান, বাজার
+
+---
+
+### কাট টু
+রাব্বি হেঁটে যাচ্ছে।
+"""
+
+
+def test_table_rows_become_scenes():
+    assert split_scenes(TABLE_SCRIPT) == [
+        "কনসেপ্ট: অতিথি দৃশ্যপট: সকালবেলা। বাড়িতে হইচই।",
+        "Scene 1: বাবা খুব টেনশনে। Baba: ওগো শুনছো? Ma: তুমিও না!",
+        "Scene 2: মা বোতল এগিয়ে দেন। Ma: দিন বদলাইছে না?",
+    ]
+
+
+def test_prose_splits_on_rules_and_headings():
+    assert split_scenes(PROSE_SCRIPT) == [
+        "গল্পঃ গ্যাঞ্জাম গরমটা অসহনীয়। চায়ের দোকান, বাজার",
+        "কাট টু রাব্বি হেঁটে যাচ্ছে।",
+    ]
+    assert split_scenes(PROSE_SCRIPT, max_chars=20)[:2] == ["গল্পঃ গ্যাঞ্জাম", "গরমটা অসহনীয়। চায়ের দোকান, বাজার"]
+
+
+def test_segment_reductions_match_loop():
+    rng = np.random.default_rng(0)
+    counts = rng.integers(1, 9, 500)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    values = rng.standard_normal(offsets[-1]).astype(np.float32)
+    segments = [values[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+    np.testing.assert_allclose(aggregate(values, offsets[:-1], "max"), [s.max() for s in segments])
+    np.testing.assert_allclose(aggregate(values, offsets[:-1], "mean-top-n", 3),
+                               [np.sort(s)[::-1][:3].mean() for s in segments], atol=1e-6)
+
+
+if __name__ == "__main__":
+    test_table_rows_become_scenes()
+    test_prose_splits_on_rules_and_headings()
+    test_segment_reductions_match_loop()
+    print("[SUCCESS] Scene chunk checks passed.")
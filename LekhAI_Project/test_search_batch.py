@@ -0,0 +1,50 @@
+"""
+Batched retrieval test: top_k_batch (one matrix-matrix product, per-row top-k) must return the
+same scripts and scores as one top_k call per query, for dense and hybrid search over float32,
+int8 and HNSW indexes of the Ad Script Dataset.
+
+Run: python -m pytest -s test_search_batch.py   (or: python test_search_batch.py)
+Set LEKHAI_EMBED_MODEL to a local model directory to run offline.
+"""
+import os
+
+import numpy as np
+
+from utils.corpus import load_corpus
+from utils.corpus_index import CorpusIndex
+from utils.embedding_cache import load_embeddings
+from utils.encoders import DEFAULT_MODEL, ENCODER_BACKEND, load_encoder
+from utils.scene_chunks import scene_chunks
+
+MODEL_NAME = os.getenv("LEKHAI_EMBED_MODEL", DEFAULT_MODEL)
+DATASET_PATH = "Ad Script Dataset.xlsx"
+TOP_K = 5
+
+
+def test_batch_matches_single():
+    df = load_corpus(DATASET_PATH)
+    encoder = load_encoder(ENCODER_BACKEND, MODEL_NAME)
+    chunk_texts, offsets = scene_chunks(df)
+    embeddings = load_embeddings(encoder.cache_key, chunk_texts, encoder.encode)
+    queries = (df['industry'].astype(str) + " " + df['tone'].astype(str) + " "
+               + df['prompt_1'].fillna(df['product']).str[:300]).tolist()
+    query_vecs = encoder.encode(queries)
+
+    indexes = {
+        "float32": CorpusIndex(df, embeddings, chunk_offsets=offsets, ann_threshold=len(embeddings) + 1),
+        "int8": CorpusIndex(df, embeddings, chunk_offsets=offsets, ann_threshold=len(embeddings) + 1, storage="int8"),
+        "hnsw": CorpusIndex(df, embeddings, chunk_offsets=offsets, ann_threshold=1),
+    }
+    for name, index in indexes.items():
+        for texts in (None, queries):
+            batch = index.top_k_batch(query_vecs, TOP_K, texts)
+            for i, (rows, scores) in enumerate(batch):
+                single_rows, single_scores = index.top_k(query_vecs[i], TOP_K, None if texts is None else texts[i])
+                assert rows.tolist() == single_rows.tolist(), (name, i)
+                np.testing.assert_allclose(scores, single_scores, atol=1e-6)
+        print(f"[{name}] batch == single on {len(queries)} queries (dense and hybrid)")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single()
+    print("[SUCCESS] Batched retrieval matches single-query retrieval.")
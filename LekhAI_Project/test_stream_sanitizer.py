@@ -0,0 +1,78 @@
+"""
+Streaming sanitizer test: for any chunking of a script, StreamSanitizer's pieces join to exactly
+sanitize_script(script) — newline floods, whitespace-only lines and repeated-character runs split
+across chunk boundaries included — and a runaway stream stops at the cap with the notice.
+
+Run: python -m pytest test_stream_sanitizer.py   (or: python test_stream_sanitizer.py)
+"""
+import random
+
+from utils.script_sanitizer import MAX_CHARS, TRUNCATION_NOTICE, StreamSanitizer, sanitize_script
+
+PIECES = [
+    "| দৃশ্য | ভিজ্যুয়াল | অডিও |", "|---|---|---|", "**Scene 1**", "আমার সোনার বাংলা", "Hook: ", "VO:",
+    "\n", "\n", "\n\n\n\n", "   ", "\t", " \n  \n \n", "\r\n", "-" * 20, "-" * 21, "-" * 50, "-" * 51,
+    "." * 300, "*" * 49, "=" * 75, "আ" * 60, "!!", "a" * 80,
+]
+
+
+def stream(text, sizes):
+    sanitizer = StreamSanitizer()
+    out, i = [], 0
+    while i < len(text):
+        n = random.choice(sizes)
+        out.append(sanitizer.feed(text[i:i + n]))
+        i += n
+    out.append(sanitizer.finish())
+    return out
+
+
+def random_script(rng, pieces=40):
+    return "".join(rng.choice(PIECES) for _ in range(pieces))
+
+
+def test_matches_batch_sanitizer_for_any_chunking():
+    rng = random.Random(7)
+    random.seed(7)
+    for _ in range(300):
+        text = "  \n" * rng.randint(0, 2) + random_script(rng) + " \n\n " * rng.randint(0, 2)
+        expected = sanitize_script(text)
+        assert len(expected) <= MAX_CHARS
+        for sizes in ([1], [2, 3], [7, 64], [len(text)]):
+            assert "".join(stream(text, sizes)) == expected, repr(text)
+
+
+def test_runs_split_across_chunks():
+    sanitizer = StreamSanitizer()
+    assert sanitizer.feed("Hook" + "-" * 15) == "Hook" + "-" * 15
+    assert sanitizer.feed("-" * 30) == "-" * 5  # past 20 the run is held until its length is known
+    assert sanitizer.feed("-" * 30 + "\n\n\n\nEnd") == "\n\nEnd"  # 75 in total: cut to 20
+    assert sanitizer.feed("-" * 30) == "-" * 20
+    assert sanitizer.finish() == "-" * 10  # 30 <= 50: kept whole
+
+
+def test_whitespace_is_held_not_dropped():
+    sanitizer = StreamSanitizer()
+    assert sanitizer.feed("\n  \nLine one  ") == "Line one"
+    assert sanitizer.feed("  \n \t\n\n") == ""
+    assert sanitizer.feed("Line two") == "\n\nLine two"
+    assert sanitizer.feed("\n\n   \n") == "" and sanitizer.finish() == ""
+
+
+def test_cap_stops_stream_with_notice():
+    sanitizer = StreamSanitizer()
+    line = "| দৃশ্য ১ | ভিজ্যুয়াল | অডিও |\n"
+    out = [sanitizer.feed(line) for _ in range(2 * MAX_CHARS // len(line))]
+    out.append(sanitizer.finish())
+    text = "".join(out)
+    assert sanitizer.truncated and text.endswith(TRUNCATION_NOTICE)
+    assert len(text) <= MAX_CHARS + len(TRUNCATION_NOTICE)
+    assert sanitizer.feed("more") == ""
+
+
+if __name__ == "__main__":
+    test_matches_batch_sanitizer_for_any_chunking()
+    test_runs_split_across_chunks()
+    test_whitespace_is_held_not_dropped()
+    test_cap_stops_stream_with_notice()
+    print("[SUCCESS] Streaming sanitizer checks passed.")
@@ -0,0 +1,77 @@
+"""
+ANN Index — HNSW (hnswlib) over the normalized corpus embeddings for large corpora.
+Below LEKHAI_ANN_THRESHOLD rows, or when hnswlib isn't installed, search_vectors stays on exact
+brute force, which is also the ground truth the ANN path is measured against.
+"""
+import os
+import threading
+
+import numpy as np
+
+ANN_THRESHOLD = int(os.getenv("LEKHAI_ANN_THRESHOLD", "5000"))
+HNSW_M = int(os.getenv("LEKHAI_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("LEKHAI_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.getenv("LEKHAI_HNSW_EF_SEARCH", "64"))
+
+
+class HnswIndex:
+    """Inner-product HNSW graph; scores are cosine similarities (rows are L2-normalized)."""
+
+    def __init__(self, embeddings, m: int = HNSW_M, ef_construction: int = HNSW_EF_CONSTRUCTION,
+                 ef_search: int = HNSW_EF_SEARCH):
+        import hnswlib
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.size = len(vectors)
+        self.ef_search = ef_search
+        self.index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self.index.init_index(max_elements=self.size, ef_construction=ef_construction, M=m)
+        self.index.add_items(vectors, np.arange(self.size))
+        self.index.set_ef(ef_search)
+        self._ef_lock = threading.Lock()
+
+    def query(self, query_vecs, k: int):
+        """Returns (indices, scores), each shaped (n_queries, k), best first."""
+        k = min(k, self.size)
+        if k > self.ef_search:  # ef must be >= k; only ever grows
+            # Retrievals query from many threads: the lock stops two of them racing set_ef (a smaller
+            # k winning last would lower ef under the other), and ef_search is only raised after
+            # set_ef, so a query that sees ef_search >= k is searching with at least that ef.
+            with self._ef_lock:
+                if k > self.ef_search:
+                    self.index.set_ef(k)
+                    self.ef_search = k
+        labels, distances = self.index.knn_query(np.atleast_2d(query_vecs).astype(np.float32), k=k)
+        # hnswlib "ip" distance is 1 - <q, x>
+        return labels.astype(np.int64), (1.0 - distances).astype(np.float32)
+
+
+def top_k_scores(scores, k: int):
+    """(indices, scores) of the k largest entries per row, best first. argpartition selects the
+    k winners in O(n); only those k are sorted."""
+    scores = np.atleast_2d(scores)
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((len(scores), 0), dtype=np.int64), np.empty((len(scores), 0), dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def exact_top_k(embeddings, query_vecs, k: int):
+    """Brute-force cosine top-k with the same (indices, scores) shape as HnswIndex.query."""
+    return top_k_scores(np.atleast_2d(query_vecs) @ np.asarray(embeddings).T, k)
+
+
+def build_ann_index(embeddings, threshold: int = None):
+    """HnswIndex for corpora at or above the threshold, else None (exact search)."""
+    threshold = ANN_THRESHOLD if threshold is None else threshold
+    if embeddings is None or len(embeddings) < threshold:
+        return None
+    try:
+        import hnswlib  # noqa: F401
+    except ImportError:
+        print(f"[WARN] hnswlib not installed; exact search over {len(embeddings)} rows.")
+        return None
+    print(f"[INFO] Building HNSW index over {len(embeddings)} rows...")
+    return HnswIndex(embeddings)
@@ -0,0 +1,140 @@
+"""
+Circuit Breaker — Stops sending calls to a degraded Gemini tier/model so requests fall through
+to the next tier at once instead of timing out key after key.
+
+    closed     calls flow; LEKHAI_BREAKER_FAILURES consecutive failures, or an error rate of at least
+               LEKHAI_BREAKER_ERROR_RATE over the last LEKHAI_BREAKER_WINDOW calls, opens the circuit
+    open       every call is rejected for LEKHAI_BREAKER_COOLDOWN seconds (doubling on each failed
+               probe, capped at LEKHAI_BREAKER_MAX_COOLDOWN)
+    half_open  up to LEKHAI_BREAKER_PROBES calls at a time go through as probes; that many successes
+               close the circuit, one failure opens it again
+
+Only tier health counts as failure: timeouts, connection errors and 5xx. 429s are a key's quota
+(utils/key_scheduler.py) and other 4xx are the request's fault, so neither moves the breaker.
+Every allowed call must end in success(), failure() or release().
+"""
+import os
+import threading
+import time
+from collections import deque
+
+BREAKER_FAILURES = int(os.getenv("LEKHAI_BREAKER_FAILURES", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("LEKHAI_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_WINDOW = int(os.getenv("LEKHAI_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = 10  # window must hold this many calls before the error rate can open the circuit
+BREAKER_COOLDOWN = float(os.getenv("LEKHAI_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = float(os.getenv("LEKHAI_BREAKER_MAX_COOLDOWN", "600"))
+BREAKER_PROBES = int(os.getenv("LEKHAI_BREAKER_PROBES", "1"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def is_tier_failure(error) -> bool:
+    """True for errors that say the tier is unhealthy (no HTTP status, or 5xx)."""
+    code = getattr(error, "code", None)
+    return not isinstance(code, int) or code >= 500
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, error_rate: float = BREAKER_ERROR_RATE,
+                 window: int = BREAKER_WINDOW, cooldown: float = BREAKER_COOLDOWN, probes: int = BREAKER_PROBES):
+        self.name = name
+        self.failure_threshold = failures
+        self.error_rate_threshold = error_rate
+        self.base_cooldown = cooldown
+        self.probes = probes
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # True = failure
+        self._consecutive = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "rejected": 0, "successes": 0, "failures": 0, "transitions": {}}
+
+    # --- transitions (callers hold self._lock) ---
+    def _transition(self, state, reason):
+        key = f"{self.state}->{state}"
+        self._stats["transitions"][key] = self._stats["transitions"].get(key, 0) + 1
+        tag = "[INFO]" if state == CLOSED else "[WARN]"
+        print(f"{tag} Circuit {self.name}: {self.state} -> {state} ({reason})")
+        self.state = state
+        self._probes_in_flight = self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+            self._consecutive = 0
+            self._cooldown = self.base_cooldown
+
+    def _open(self, reason, now):
+        self._transition(OPEN, reason)
+        self._open_until = now + self._cooldown
+
+    def _error_rate(self):
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    # --- public API ---
+    def allow(self) -> bool:
+        """Whether a call may go to this tier now (in half-open, only as one of the probes)."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now >= self._open_until:
+                self._transition(HALF_OPEN, f"cooldown of {self._cooldown:g}s elapsed")
+            if self.state == HALF_OPEN:
+                allowed = self._probes_in_flight < self.probes
+                self._probes_in_flight += allowed
+            else:
+                allowed = self.state == CLOSED
+            self._stats["allowed" if allowed else "rejected"] += 1
+            return allowed
+
+    def success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._transition(CLOSED, f"{self._probe_successes} probe(s) succeeded")
+            else:
+                self._consecutive = 0
+                self._outcomes.append(False)
+
+    def failure(self, error=None):
+        """An allowed call failed; only tier-health errors (is_tier_failure) count against the tier."""
+        if error is not None and not is_tier_failure(error):
+            self.release()
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            if self.state == HALF_OPEN:
+                self._cooldown = min(self._cooldown * 2, BREAKER_MAX_COOLDOWN)
+                self._open("probe failed", now)
+            elif self.state == CLOSED:
+                self._consecutive += 1
+                self._outcomes.append(True)
+                rate = self._error_rate()
+                if self._consecutive >= self.failure_threshold:
+                    self._open(f"{self._consecutive} consecutive failures", now)
+                elif len(self._outcomes) >= BREAKER_MIN_CALLS and rate >= self.error_rate_threshold:
+                    self._open(f"error rate {rate:.0%} over {len(self._outcomes)} calls", now)
+
+    def release(self):
+        """An allowed call that says nothing about the tier (not made, 429, other 4xx)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            s = dict(self._stats, transitions=dict(self._stats["transitions"]))
+            s.update(
+                state=self.state,
+                consecutive_failures=self._consecutive,
+                error_rate=round(self._error_rate(), 3),
+                window_calls=len(self._outcomes),
+                retry_in_seconds=round(max(0.0, self._open_until - now), 1) if self.state == OPEN else 0.0,
+            )
+        return s
@@ -0,0 +1,133 @@
+"""
+Corpus Loader — Reads the Ad Script Dataset and derives the retrieval columns.
+The cleaned corpus is snapshotted to Parquet (industry/tone stored as categorical codes)
+and only rebuilt when the source workbook's hash changes.
+"""
+import os
+import json
+import hashlib
+import pandas as pd
+
+from utils.embedding_cache import CACHE_DIR
+
+SNAPSHOT_VERSION = 1
+CATEGORICAL_COLUMNS = ["industry", "tone_1", "tone_2", "tone"]
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    """Raw workbook read (the slow openpyxl path)."""
+    return pd.read_excel(path)
+
+
+def clean_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Basic cleaning + derived columns. Columns are lowercase: script, industry, tone_1, tone_2, product, duration, type"""
+    df = df.loc[:, ~df.columns.astype(str).str.startswith("Unnamed")]
+    df = df[df['script'].notna() & (df['script'].str.len() > 10)].copy()
+    df['industry'] = df['industry'].fillna('General')
+    df['tone_1'] = df['tone_1'].fillna('Neutral')
+    df['tone_2'] = df['tone_2'].fillna('')
+    df['product'] = df['product'].fillna('Unknown')
+    # Combined tone column for convenience ("tone_1, tone_2" or just "tone_1")
+    df['tone'] = (df['tone_1'] + (', ' + df['tone_2']).where(df['tone_2'] != '', '')).str.strip()
+
+    # Create search text
+    df['search_text'] = df['industry'] + " " + df['tone'] + " " + df['product'] + " " + df['script'].str[:200]
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def _snapshot_paths(snapshot_dir: str):
+    base = os.path.join(snapshot_dir, "corpus_snapshot")
+    return base + ".parquet", base + ".json"
+
+
+def write_snapshot(df: pd.DataFrame, source_hash: str, snapshot_dir: str = None):
+    """Writes the cleaned corpus to the Parquet snapshot (best effort)."""
+    snapshot_dir = snapshot_dir or CACHE_DIR
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        parquet_path, meta_path = _snapshot_paths(snapshot_dir)
+        tmp_suffix = f".tmp{os.getpid()}"
+        df.to_parquet(parquet_path + tmp_suffix, index=True)
+        os.replace(parquet_path + tmp_suffix, parquet_path)
+        with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "source_sha256": source_hash, "rows": len(df)}, f)
+        os.replace(meta_path + tmp_suffix, meta_path)
+        print(f"[INFO] Corpus snapshot written ({len(df)} rows).")
+    except Exception as e:
+        # e.g. pyarrow not installed — the workbook path still works, just slower
+        print(f"[WARN] Could not write corpus snapshot: {e}")
+
+
+def build_snapshot(path: str, snapshot_dir: str = None, source_hash: str = None) -> pd.DataFrame:
+    """Reads + cleans the workbook and writes the Parquet snapshot. Returns the cleaned DataFrame."""
+    source_hash = source_hash or file_sha256(path)
+    df = clean_dataset(read_dataset(path))
+    write_snapshot(df, source_hash, snapshot_dir)
+    return df
+
+
+def load_snapshot(path: str, snapshot_dir: str = None, source_hash: str = None):
+    """Returns the snapshot DataFrame if it matches the workbook's current hash, else None."""
+    snapshot_dir = snapshot_dir or CACHE_DIR
+    parquet_path, meta_path = _snapshot_paths(snapshot_dir)
+    if not (os.path.exists(parquet_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        source_hash = source_hash or file_sha256(path)
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("source_sha256") != source_hash:
+            print("[INFO] Corpus snapshot is stale (workbook changed).")
+            return None
+        df = pd.read_parquet(parquet_path)
+        if len(df) != meta.get("rows"):
+            return None
+        return df
+    except Exception as e:
+        print(f"[WARN] Corpus snapshot unreadable ({e}). Rebuilding.")
+        return None
+
+
+def read_corpus(path: str, snapshot_dir: str = None):
+    """
+    First half of load_corpus. Returns (frame, source_hash, cleaned):
+    the fresh snapshot (already cleaned) or the raw workbook rows.
+    """
+    source_hash = file_sha256(path)
+    df = load_snapshot(path, snapshot_dir, source_hash)
+    if df is not None:
+        print(f"[INFO] Loaded corpus snapshot ({len(df)} rows).")
+        return df, source_hash, True
+    return read_dataset(path), source_hash, False
+
+
+def finish_corpus(frame: pd.DataFrame, source_hash: str, cleaned: bool, snapshot_dir: str = None) -> pd.DataFrame:
+    """Second half of load_corpus: cleans raw workbook rows and re-snapshots them."""
+    if cleaned:
+        return frame
+    df = clean_dataset(frame)
+    write_snapshot(df, source_hash, snapshot_dir)
+    return df
+
+
+def load_corpus(path: str, snapshot_dir: str = None) -> pd.DataFrame:
+    """Cleaned corpus from the snapshot when fresh, otherwise from the workbook (and re-snapshot)."""
+    return finish_corpus(*read_corpus(path, snapshot_dir), snapshot_dir=snapshot_dir)
+
+
+if __name__ == "__main__":
+    # Build step: python -m utils.corpus ["Ad Script Dataset.xlsx"]
+    import sys
+    dataset = sys.argv[1] if len(sys.argv) > 1 else "Ad Script Dataset.xlsx"
+    build_snapshot(dataset)
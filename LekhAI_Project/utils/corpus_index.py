@@ -0,0 +1,238 @@
+"""
+Corpus Index — One immutable retrieval snapshot: the cleaned corpus frame, its scene-chunk embedding
+rows with the chunk -> script offsets, (for large corpora) the ANN graph over the chunks and the BM25
+matrix over the scripts. The engine publishes a whole new instance with a single reference assignment,
+so a search that grabbed the old index keeps using it consistently while a reload swaps in the next one.
+"""
+import time
+
+import numpy as np
+
+from utils.ann_index import build_ann_index, top_k_scores
+from utils.embedding_cache import normalize_rows
+from utils.lexical_index import RRF_DEPTH, Bm25Index, reciprocal_rank_fusion
+from utils.metadata_index import MetadataIndex
+from utils.mmr import MMR_LAMBDA, MMR_POOL, MMR_PRIORITY_WEIGHT, mmr_select
+from utils.quantized import RESCORE_DEPTH, build_compact
+from utils.scene_chunks import CHUNK_ANN_OVERFETCH, aggregate
+
+
+class CorpusIndex:
+    def __init__(self, df, embeddings, source_hash: str = None, ann_threshold: int = None, chunk_offsets=None,
+                 storage: str = None):
+        self.df = df
+        self.embeddings = embeddings  # one row per scene chunk
+        self.source_hash = source_hash
+        empty = embeddings is None
+        # Script i owns embedding rows offsets[i]:offsets[i+1] (default: one row per script)
+        self.offsets = np.asarray(chunk_offsets if chunk_offsets is not None
+                                  else np.arange(0 if empty else len(embeddings) + 1), dtype=np.int64)
+        self.starts = self.offsets[:-1]
+        self.chunk_script = np.repeat(np.arange(len(self.starts)), np.diff(self.offsets))
+        # HNSW graph above LEKHAI_ANN_THRESHOLD chunk rows, None = exact brute force
+        self.ann = build_ann_index(embeddings, ann_threshold)
+        # float16 / int8 copy for the exact path's first pass (LEKHAI_EMBED_STORAGE), None = float32 scan
+        self.compact = None if self.ann is not None else build_compact(embeddings, storage)
+        self.built_at = time.time()
+        # Result columns pulled out of the frame once, so building results never touches df.iloc
+        self.scripts = [] if empty else df["script"].tolist()
+        self.industries = [] if empty else df["industry"].astype(str).tolist()
+        self.tones = [] if empty else df["tone"].astype(str).tolist()
+        self.products = [] if empty else df["product"].tolist()
+        # Inverted indexes over industry / tone_1 / tone_2 / product for filtered search
+        self.meta = MetadataIndex(df.iloc[:0] if empty else df)
+        # BM25 over the full script text (Bangla terms the English encoder can't see)
+        self.lexical = None if empty else Bm25Index(self.scripts)
+
+    def __len__(self):
+        return 0 if self.embeddings is None else len(self.df)
+
+    def script_scores(self, query_vecs, rows=None) -> np.ndarray:
+        """
+        Per-script cosine scores aggregated over each script's chunks (max-sim or mean-top-n).
+        `query_vecs` is one query (-> 1-D) or a (n_queries, dim) batch scored with one
+        matrix-matrix product (-> 2-D); `rows` restricts a single query to those scripts.
+        Segment reductions, no per-script loop.
+        """
+        if rows is None:
+            return aggregate(query_vecs @ np.asarray(self.embeddings).T, self.starts)
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return np.empty(0, dtype=np.float32)
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        starts = np.cumsum(lengths) - lengths
+        # Chunk rows of the selected scripts, concatenated in `rows` order
+        chunk_ids = np.repeat(self.offsets[rows] - starts, lengths) + np.arange(lengths.sum())
+        return aggregate(np.asarray(self.embeddings[chunk_ids]) @ query_vecs, starts)
+
+    def _rescore(self, query_vec, rows, k: int):
+        top, scores = top_k_scores(self.script_scores(query_vec, rows), k)
+        return rows[top[0]], scores[0]
+
+    def dense_top_k_batch(self, query_vecs, k: int) -> list:
+        """
+        [(indices, scores), ...] of the k best scripts per query, best first
+        (HNSW over chunks when built, else exact with a per-row argpartition).
+        """
+        query_vecs = np.atleast_2d(query_vecs)
+        if self.ann is not None:
+            # Nearest chunks -> their scripts -> exact chunk aggregation for those scripts only
+            chunk_hits, _ = self.ann.query(query_vecs, k * CHUNK_ANN_OVERFETCH)
+            wanted = min(k, len(self.starts))
+            hits = []
+            for q, chunks in zip(query_vecs, chunk_hits):
+                rows = np.unique(self.chunk_script[chunks])
+                if len(rows) < wanted:
+                    # The nearest chunks crowd into fewer than k scripts (one long script near the
+                    # query): exact scan for this query rather than a short result. A wider ANN
+                    # query would raise the shared ef for every later search.
+                    top, scores = top_k_scores(self.script_scores(q), k)
+                    hits.append((top[0], scores[0]))
+                else:
+                    hits.append(self._rescore(q, rows, k))
+            return hits
+        if self.compact is not None:
+            # Compact first pass over every chunk, exact float32 rescoring of the best candidates
+            approx = aggregate(self.compact.scores(query_vecs), self.starts)
+            candidates, _ = top_k_scores(approx, max(k, RESCORE_DEPTH))
+            return [self._rescore(q, rows, k) for q, rows in zip(query_vecs, candidates)]
+        indices, scores = top_k_scores(self.script_scores(query_vecs), k)
+        return list(zip(indices, scores))
+
+    def dense_top_k(self, query_vec, k: int):
+        """(indices, scores) of the k best scripts for one query."""
+        return self.dense_top_k_batch(query_vec, k)[0]
+
+    def top_k_batch(self, query_vecs, k: int, query_texts=None) -> list:
+        """
+        Dense top-k per query, or with `query_texts` the dense and BM25 rankings (RRF_DEPTH deep
+        each) fused by reciprocal rank fusion. Returned scores are always cosine similarities.
+        """
+        if query_texts is None or self.lexical is None:
+            return self.dense_top_k_batch(query_vecs, k)
+        query_vecs = np.atleast_2d(query_vecs)
+        depth = max(k, RRF_DEPTH)
+        dense = self.dense_top_k_batch(query_vecs, depth)
+        lexical = self.lexical.top_k_batch(query_texts, depth)
+        hits = []
+        for q, (dense_rows, _), (lexical_rows, _) in zip(query_vecs, dense, lexical):
+            fused, _ = reciprocal_rank_fusion([dense_rows, lexical_rows])
+            top = fused[:k]
+            hits.append((top, self.script_scores(q, top)))
+        return hits
+
+    def top_k(self, query_vec, k: int, query_text: str = None):
+        """(indices, scores) for one query; same path as top_k_batch."""
+        return self.top_k_batch(query_vec, k, None if query_text is None else [query_text])[0]
+
+    def script_centroids(self, rows) -> np.ndarray:
+        """One normalized vector per script (mean of its chunk embeddings), for MMR redundancy."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+        lengths = self.offsets[rows + 1] - self.offsets[rows]
+        starts = np.cumsum(lengths) - lengths
+        chunk_ids = np.repeat(self.offsets[rows] - starts, lengths) + np.arange(lengths.sum())
+        return normalize_rows(np.add.reduceat(np.asarray(self.embeddings[chunk_ids]), starts, axis=0))
+
+    @staticmethod
+    def _priority_order(priority, scores, lexical=None) -> np.ndarray:
+        """
+        Candidate order: priority first, then the cosine score, or with BM25 `lexical` scores the
+        dense + BM25 RRF score. Both tie-breakers lie within [-1, 1], so priority * 4 + tie-breaker
+        keeps that order.
+        """
+        tie_break = scores
+        if lexical is not None:
+            hits = np.flatnonzero(lexical > 0)
+            # Rankings as candidate positions; every candidate is in the dense one
+            fused_pos, fused = reciprocal_rank_fusion([
+                np.argsort(-scores, kind="stable"),
+                hits[np.argsort(-lexical[hits], kind="stable")],
+            ])
+            tie_break = np.empty(len(scores))
+            tie_break[fused_pos] = fused
+        return np.argsort(-(priority * 4.0 + tie_break), kind="stable")
+
+    def _filtered_pool(self, query_vec, query_text, candidates, priority, depth):
+        """Top `depth` of the metadata-matched `candidates` (ranked as in _priority_order) with their cosine scores."""
+        scores = self.script_scores(query_vec, candidates)
+        lexical = (self.lexical.scores_batch([query_text], candidates)[0]
+                   if query_text is not None and self.lexical is not None else None)
+        top = self._priority_order(priority[candidates], scores, lexical)[:depth]
+        return candidates[top], scores[top]
+
+    def _open_pool(self, query_vec, query_text, taken, depth):
+        """Top `depth` untaken scripts of the whole corpus via top_k (HNSW / compact storage, BM25 fusion)."""
+        rows, scores = self.top_k(query_vec, depth + int(taken.sum()), query_text)
+        keep = ~taken[rows]
+        return rows[keep][:depth], scores[keep][:depth]
+
+    def reference_sets(self, query_vecs, priorities, sizes, query_texts=None, min_rows: int = 1,
+                       pool: int = MMR_POOL, lambda_: float = MMR_LAMBDA, exclude=None) -> list:
+        """
+        One diversified reference set per query (e.g. industry-conditioned, tone-conditioned).
+
+        Each set is drawn from the rows its priority vector matches, scored only over those rows and
+        ranked as in _priority_order; when fewer than `min_rows` match, from the whole corpus through
+        top_k (the HNSW / compact-storage path). MMR then picks `size` of the top `pool`, with the
+        priority folded into relevance (cosine + MMR_PRIORITY_WEIGHT * priority) and staying away
+        from scripts already picked for earlier sets; a script is never reused across sets, and
+        rows in `exclude` are never picked.
+        Returns [(indices, scores, priority), ...].
+        """
+        query_vecs = np.atleast_2d(query_vecs)
+        texts = query_texts if query_texts is not None else [None] * len(query_vecs)
+        taken = np.zeros(len(self), dtype=bool)
+        if exclude is not None:
+            taken[exclude] = True
+        seen = np.empty((0, query_vecs.shape[1]), dtype=np.float32)
+        sets = []
+        for query_vec, text, priority, size in zip(query_vecs, texts, priorities, sizes):
+            depth = max(pool, size)
+            candidates = np.flatnonzero((priority > 0) & ~taken)
+            if len(candidates) >= min_rows:
+                pool_rows, pool_scores = self._filtered_pool(query_vec, text, candidates, priority, depth)
+            else:
+                print(f"[INFO] Metadata filter matched {len(candidates)} rows; searching the full corpus.")
+                priority = np.zeros_like(priority)
+                pool_rows, pool_scores = self._open_pool(query_vec, text, taken, depth)
+            vectors = self.script_centroids(pool_rows)
+            relevance = pool_scores + MMR_PRIORITY_WEIGHT * priority[pool_rows]
+            picks = mmr_select(relevance, vectors, size, lambda_, seen)
+            rows = pool_rows[picks]
+            taken[rows] = True
+            seen = np.vstack([seen, vectors[picks]])
+            sets.append((rows, pool_scores[picks], priority))
+        return sets
+
+    def results(self, indices, scores, priority=None) -> list:
+        """search_vectors result dicts for the given rows (plus each row's "priority" when given)."""
+        results = [
+            {
+                "script": self.scripts[i],
+                "metadata": {
+                    "industry": self.industries[i],
+                    "tone": self.tones[i],
+                    "product": self.products[i],
+                },
+                "score": score,
+            }
+            for i, score in zip(indices.tolist(), scores.tolist())
+        ]
+        if priority is not None:
+            for result, i in zip(results, indices.tolist()):
+                result["priority"] = int(priority[i])
+        return results
+
+    def describe(self) -> dict:
+        return {
+            "rows": len(self),
+            "source_sha256": self.source_hash,
+            "chunks": len(self.chunk_script),
+            "search": "hnsw" if self.ann is not None else "exact",
+            "storage": self.compact.storage if self.compact is not None else "float32",
+            "float32_mb": round(self.embeddings.nbytes / 2**20, 2) if self.embeddings is not None else 0,
+            "first_pass_mb": round(self.compact.nbytes / 2**20, 2) if self.compact is not None else None,
+            "built_at": self.built_at,
+        }
@@ -47,6 +47,11 @@ def _load_all():
     return pd.DataFrame()
 
 
+def preload_dialects() -> int:
+    """Loads the ONUBAD examples into the cache ahead of the first dialect request."""
+    return len(_load_all())
+
+
 def get_dialect_examples(dialect_key: str, n: int = 8) -> str:
     """
     Returns a formatted string of n random Standard Bangla → Dialect examples.
@@ -0,0 +1,146 @@
+"""
+Embedding Cache — Persists the normalized corpus embedding matrix on disk.
+Each row is keyed by a hash of (embedding model name, row text), so on startup
+only new or edited rows are re-encoded and the rest is memory-mapped straight from disk.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+CACHE_DIR = os.getenv(
+    "LEKHAI_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache"),
+)
+CACHE_VERSION = 1
+
+
+def row_key(model_name: str, text: str) -> str:
+    """Content address of one corpus row for a given embedding model."""
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so a dot product equals cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _cache_paths(model_name: str, cache_dir: str):
+    slug = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+    base = os.path.join(cache_dir, f"embeddings_{slug}")
+    return base + ".npy", base + ".json"
+
+
+def _checksum(matrix: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(matrix).data).hexdigest()
+
+
+def _read_cache(model_name: str, cache_dir: str):
+    """Returns (mmap matrix, row keys) or (None, None) if the cache is missing, stale or corrupt."""
+    npy_path, meta_path = _cache_paths(model_name, cache_dir)
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None, None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION or meta.get("model") != model_name:
+            print("[WARN] Embedding cache is from another model/version. Rebuilding.")
+            return None, None
+
+        matrix = np.load(npy_path, mmap_mode="r")
+        keys = meta["keys"]
+        if (matrix.dtype != np.float32 or matrix.ndim != 2
+                or matrix.shape != (len(keys), meta["dim"])
+                or _checksum(matrix) != meta["checksum"]):
+            print("[WARN] Embedding cache failed integrity check. Rebuilding.")
+            return None, None
+        return matrix, keys
+    except Exception as e:
+        print(f"[WARN] Embedding cache unreadable ({e}). Rebuilding.")
+        return None, None
+
+
+def _write_cache(model_name: str, cache_dir: str, matrix: np.ndarray, keys):
+    """Atomically replace the cache files (matrix first, metadata last)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    npy_path, meta_path = _cache_paths(model_name, cache_dir)
+    tmp_suffix = f".tmp{os.getpid()}"
+
+    with open(npy_path + tmp_suffix, "wb") as f:
+        np.save(f, matrix)
+    os.replace(npy_path + tmp_suffix, npy_path)
+
+    meta = {
+        "version": CACHE_VERSION,
+        "model": model_name,
+        "dim": int(matrix.shape[1]),
+        "checksum": _checksum(matrix),
+        "keys": list(keys),
+    }
+    with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + tmp_suffix, meta_path)
+
+
+def load_embeddings(model_name: str, texts, encode_fn, cache_dir: str = None) -> np.ndarray:
+    """
+    Returns the normalized float32 embedding matrix for `texts`, memory-mapped from disk.
+
+    Args:
+        model_name: Embedding model identifier (part of every row key)
+        texts: List of corpus strings, one per row
+        encode_fn: Callable(list[str]) -> array of raw embeddings, used only for cache misses
+        cache_dir: Override for the cache directory
+
+    Rows whose key is already cached are reused; only the remainder is encoded.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    texts = list(texts)
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    keys = [row_key(model_name, t) for t in texts]
+
+    cached, cached_keys = _read_cache(model_name, cache_dir)
+    if cached is not None and cached_keys == keys:
+        print(f"[INFO] Embedding cache hit ({len(keys)} rows).")
+        return cached
+
+    cached_pos = {k: i for i, k in enumerate(cached_keys)} if cached is not None else {}
+    missing = [i for i, k in enumerate(keys) if k not in cached_pos]
+    print(f"[INFO] Embedding cache: {len(keys) - len(missing)} reused, {len(missing)} to encode.")
+
+    fresh = normalize_rows(encode_fn([texts[i] for i in missing])) if missing else None
+    dim = fresh.shape[1] if fresh is not None else cached.shape[1]
+
+    matrix = np.empty((len(texts), dim), dtype=np.float32)
+    if missing:
+        matrix[missing] = fresh
+    reused = [i for i, k in enumerate(keys) if k in cached_pos]
+    if reused:
+        matrix[reused] = cached[[cached_pos[keys[i]] for i in reused]]
+    cached = None  # release the old mmap before replacing its file (required on Windows)
+
+    try:
+        _write_cache(model_name, cache_dir, matrix, keys)
+    except Exception as e:
+        print(f"[WARN] Could not persist embedding cache: {e}")
+        return matrix
+
+    cached, _ = _read_cache(model_name, cache_dir)
+    return cached if cached is not None else matrix
+
+
+def attach_embeddings(model_name: str, texts, cache_dir: str = None) -> np.ndarray:
+    """
+    Read-only attach for serving workers: memory-maps the published matrix and never encodes.
+    Raises RuntimeError if the cache is missing or does not match `texts` (run build_index.py).
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    keys = [row_key(model_name, t) for t in texts]
+    cached, cached_keys = _read_cache(model_name, cache_dir)
+    if cached is None or cached_keys != keys:
+        raise RuntimeError("Published embedding matrix is missing or stale. Run `python build_index.py` first.")
+    print(f"[INFO] Attached to published embeddings ({len(keys)} rows, read-only mmap).")
+    return cached
@@ -0,0 +1,123 @@
+"""
+Sentence Encoders — Pluggable backends for the all-MiniLM-L6-v2 retrieval embeddings.
+
+    torch      sentence-transformers on PyTorch (default)
+    onnx       ONNX Runtime, fp32 export shipped in the model repo
+    onnx-int8  ONNX Runtime, dynamically quantized int8 (built once from the fp32 export)
+
+Select with LEKHAI_ENCODER_BACKEND. Every backend returns L2-normalized float32 rows.
+"""
+import os
+import numpy as np
+
+from utils.embedding_cache import CACHE_DIR, normalize_rows
+
+ENCODER_BACKEND = os.getenv("LEKHAI_ENCODER_BACKEND", "torch").lower()
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+MAX_SEQ_LENGTH = 256  # sentence-transformers' max_seq_length for all-MiniLM-L6-v2
+
+
+class TorchEncoder:
+    """sentence-transformers (imports torch on construction)."""
+    backend = "torch"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+        from utils.hardware import torch_device
+        self.model = SentenceTransformer(model_name, device=torch_device())
+        self.cache_key = encoder_cache_key(self.backend, model_name)
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=batch_size, show_progress_bar=False)
+        return normalize_rows(vectors)
+
+
+class OnnxEncoder:
+    """ONNX Runtime + HF tokenizers, mean pooling over the attention mask (no torch)."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, quantized: bool = False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.cache_key = encoder_cache_key(self.backend, model_name)
+
+        model_path = _model_file(model_name, "onnx/model.onnx")
+        if quantized:
+            model_path = _quantize(model_path, model_name)
+
+        self.tokenizer = Tokenizer.from_file(_model_file(model_name, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(os.getenv("LEKHAI_ONNX_THREADS", "0"))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        texts = list(texts)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in batch], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in batch], dtype=np.int64)
+
+            token_embeddings = self.session.run(None, feeds)[0]
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            out.append(pooled)
+        if not out:
+            return np.empty((0, 0), dtype=np.float32)
+        return normalize_rows(np.vstack(out))
+
+
+def _model_file(model_name: str, filename: str) -> str:
+    """Local model directory, or the sentence-transformers repo on the HF Hub."""
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, filename)
+    from huggingface_hub import hf_hub_download
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    return hf_hub_download(repo_id, filename)
+
+
+def _quantize(fp32_path: str, model_name: str) -> str:
+    """Dynamic int8 quantization of the fp32 export, cached next to the embedding cache."""
+    slug = os.path.basename(os.path.normpath(model_name))
+    int8_path = os.path.join(CACHE_DIR, "onnx", f"{slug}-int8.onnx")
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        os.makedirs(os.path.dirname(int8_path), exist_ok=True)
+        print(f"[INFO] Quantizing {slug} to int8...")
+        tmp_path = int8_path + f".tmp{os.getpid()}"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+    return int8_path
+
+
+def encoder_cache_key(backend: str = None, model_name: str = DEFAULT_MODEL) -> str:
+    """Embedding-cache identity of a backend's vectors, known without loading the model."""
+    backend = (backend or ENCODER_BACKEND).lower()
+    return model_name if backend == "torch" else f"{model_name}:{backend}"
+
+
+BACKENDS = {
+    "torch": lambda model_name: TorchEncoder(model_name),
+    "onnx": lambda model_name: OnnxEncoder(model_name, quantized=False),
+    "onnx-int8": lambda model_name: OnnxEncoder(model_name, quantized=True),
+}
+
+
+def load_encoder(backend: str = None, model_name: str = DEFAULT_MODEL):
+    """Builds the encoder for `backend` (defaults to LEKHAI_ENCODER_BACKEND)."""
+    backend = (backend or ENCODER_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
+    print(f"[INFO] Loading {model_name} encoder ({backend} backend)...")
+    return BACKENDS[backend](model_name)
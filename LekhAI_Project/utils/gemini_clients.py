@@ -0,0 +1,168 @@
+"""
+Gemini Client Pool — Builds genai.Client objects on first use instead of one per key at startup.
+Every client sends through one shared keep-alive httpx connection pool (the API key travels in
+a request header), so warm TLS connections to the Gemini endpoint are reused across keys.
+
+get_async() hands out the SDK's asyncio clients (client.aio) for the serving path. Their shared
+httpx.AsyncClient belongs to one event loop, so it (and the per-key clients on it) is rebuilt
+when called from a different loop, e.g. successive asyncio.run() calls in scripts.
+"""
+import asyncio
+import os
+import threading
+import httpx
+import google.genai as genai
+from google.genai import types
+
+GEMINI_ENDPOINT = "https://generativelanguage.googleapis.com/"
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("LEKHAI_GEMINI_MAX_CONNECTIONS", "256")),
+    max_keepalive_connections=int(os.getenv("LEKHAI_GEMINI_KEEPALIVE_CONNECTIONS", "20")),
+    keepalive_expiry=float(os.getenv("LEKHAI_GEMINI_KEEPALIVE_SECONDS", "120")),
+)
+
+
+class GeminiClientPool:
+    def __init__(self, limits: httpx.Limits = POOL_LIMITS):
+        self._limits = limits
+        self._clients = {}
+        self._http = None
+        self._aio_clients = {}
+        self._async_http = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"clients_built": 0, "requests": 0, "new_connections": 0,
+                       "reused_connections": 0, "tls_handshakes": 0}
+
+    # --- connection-reuse accounting (httpcore trace events) ---
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def _on_request(self, request):
+        self._count("requests")
+        conn = {"new": False}
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                conn["new"] = True
+                self._count("new_connections")
+            elif event_name == "connection.start_tls.complete":
+                self._count("tls_handshakes")
+
+        request.extensions["trace"] = trace
+        request.extensions["lekhai_conn"] = conn
+
+    def _on_response(self, response):
+        conn = response.request.extensions.get("lekhai_conn")
+        if conn is not None and not conn["new"]:
+            self._count("reused_connections")
+
+    # httpx.AsyncClient needs coroutine hooks, and httpcore awaits the trace callback
+    async def _on_request_async(self, request):
+        self._on_request(request)
+        sync_trace = request.extensions["trace"]
+
+        async def trace(event_name, info):
+            sync_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+
+    async def _on_response_async(self, response):
+        self._on_response(response)
+
+    def _http_client(self) -> httpx.Client:
+        if self._http is None:
+            self._http = httpx.Client(
+                limits=self._limits,
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._http
+
+    def _async_http_client(self) -> httpx.AsyncClient:
+        """The AsyncClient of the running event loop (callers hold self._lock)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._aio_clients.clear()
+            self._async_http = httpx.AsyncClient(
+                limits=self._limits,
+                event_hooks={"request": [self._on_request_async], "response": [self._on_response_async]},
+            )
+        return self._async_http
+
+    def get(self, api_key: str) -> genai.Client:
+        """Client for `api_key`, built on first use and cached."""
+        client = self._clients.get(api_key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(httpx_client=self._http_client()),
+                )
+                self._clients[api_key] = client
+                self._stats["clients_built"] += 1
+        return client
+
+    def get_async(self, api_key: str):
+        """Asyncio client (client.aio) for `api_key` on the running event loop; call from a coroutine."""
+        with self._lock:
+            http = self._async_http_client()
+            client = self._aio_clients.get(api_key)
+            if client is None:
+                client = genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(httpx_async_client=http),
+                ).aio
+                self._aio_clients[api_key] = client
+                self._stats["clients_built"] += 1
+        return client
+
+    def stats(self) -> dict:
+        """Connection-reuse stats: requests answered over a warm connection vs. ones that opened a new one."""
+        with self._stats_lock:
+            s = dict(self._stats)
+        answered = s["reused_connections"] + s["new_connections"]
+        s["reuse_ratio"] = round(s["reused_connections"] / answered, 3) if answered else None
+        return s
+
+    async def preconnect(self, connections: int = 2) -> int:
+        """Opens `connections` keep-alive TLS connections on the running loop's pool (no API call, no quota)."""
+        with self._lock:
+            http = self._async_http_client()
+
+        async def touch():
+            try:
+                await http.head(GEMINI_ENDPOINT, timeout=5)
+                return True
+            except Exception as e:
+                print(f"[WARN] Gemini pre-connect failed: {e}")
+                return False
+
+        return sum(await asyncio.gather(*(touch() for _ in range(connections))))
+
+    def close(self):
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+            self._clients.clear()
+            self._aio_clients.clear()
+
+    async def aclose(self):
+        """Closes the running loop's async connection pool (server shutdown)."""
+        with self._lock:
+            http = self._async_http if self._async_loop is asyncio.get_running_loop() else None
+            self._async_http = self._async_loop = None
+            self._aio_clients.clear()
+        if http is not None:
+            await http.aclose()
+
+
+# Global instance
+gemini_pool = GeminiClientPool()
@@ -0,0 +1,47 @@
+"""
+Hardware Probe — Lazily detects GPU capability for the optional local-LLM path.
+torch is imported only when a caller asks for the probe (local LLM requested, or the
+torch-backed embedding model being loaded), never at module import.
+"""
+import os
+
+# Production runs CPU-only Turbo mode; the local LLM has to be opted into explicitly
+LOCAL_LLM_REQUESTED = os.getenv("LEKHAI_LOCAL_LLM", "").lower() in ("1", "true", "yes")
+MIN_LOCAL_LLM_VRAM_GB = 5.0
+
+# Cache the probe result (torch import + CUDA query happen once per process)
+_cache = {}
+
+
+def probe() -> dict:
+    """Imports torch and queries CUDA. Returns {'has_gpu', 'gpu_name', 'vram_gb'}."""
+    if "probe" in _cache:
+        return _cache["probe"]
+
+    info = {"has_gpu": False, "gpu_name": None, "vram_gb": 0.0}
+    try:
+        import torch
+        if torch.cuda.is_available():
+            info["has_gpu"] = True
+            info["gpu_name"] = torch.cuda.get_device_name(0)
+            info["vram_gb"] = torch.cuda.get_device_properties(0).total_memory / 1e9
+            print(f"[INFO] GPU Detected: {info['gpu_name']} ({info['vram_gb']:.1f} GB VRAM)")
+        else:
+            print("[WARN] No GPU detected. Running in CPU (Turbo) Mode.")
+    except Exception as e:
+        print(f"[WARN] Hardware probe failed ({e}). Assuming CPU.")
+
+    _cache["probe"] = info
+    return info
+
+
+def use_local_llm() -> bool:
+    """True only when the local LLM was requested and the GPU has enough VRAM. No torch import otherwise."""
+    if not LOCAL_LLM_REQUESTED:
+        return False
+    return probe()["vram_gb"] >= MIN_LOCAL_LLM_VRAM_GB
+
+
+def torch_device() -> str:
+    """Device for torch-backed models (triggers the probe)."""
+    return "cuda" if probe()["has_gpu"] else "cpu"
@@ -0,0 +1,136 @@
+"""
+Hedged Requests — Cuts the latency tail of Gemini generation calls by racing a duplicate.
+
+If the primary call hasn't returned after the LEKHAI_HEDGE_PERCENTILE latency of recent successful
+calls, a duplicate goes out (the engine sends it on a different healthy key); the first success
+wins and the other call is cancelled. Off unless LEKHAI_HEDGE=1.
+
+The budget is a token bucket: every primary adds LEKHAI_HEDGE_BUDGET tokens (capped at
+HEDGE_BURST), every hedge spends one, so hedges never exceed that fraction of primary calls
+(0.05 = at most 5% extra quota). No hedging until LEKHAI_HEDGE_MIN_SAMPLES latencies are known.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+HEDGE_ENABLED = os.getenv("LEKHAI_HEDGE", "0").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("LEKHAI_HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET = float(os.getenv("LEKHAI_HEDGE_BUDGET", "0.05"))
+HEDGE_WINDOW = int(os.getenv("LEKHAI_HEDGE_WINDOW", "200"))  # recent latencies the percentile is taken over
+HEDGE_MIN_SAMPLES = int(os.getenv("LEKHAI_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_BURST = 10.0  # most hedges the bucket can save up
+
+
+class HedgePolicy:
+    def __init__(self, name: str, enabled: bool = HEDGE_ENABLED, percentile: float = HEDGE_PERCENTILE,
+                 budget: float = HEDGE_BUDGET, window: int = HEDGE_WINDOW, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"primaries": 0, "hedges": 0, "hedge_wins": 0, "primary_wins": 0, "both_failed": 0,
+                       "skipped_budget": 0, "skipped_no_key": 0}
+
+    def count(self, field):
+        """Adds one to a stats counter (hedges, hedge_wins, primary_wins, both_failed, ...)."""
+        with self._lock:
+            self._stats[field] += 1
+
+    def record(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self):
+        """Seconds to wait for the primary before hedging; None until enough latencies are known."""
+        with self._lock:
+            if not self._latencies or len(self._latencies) < self.min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.percentile))
+
+    def start_primary(self):
+        with self._lock:
+            self._stats["primaries"] += 1
+            self._tokens = min(self._tokens + self.budget, HEDGE_BURST)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                self._stats["skipped_budget"] += 1
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def refund(self):
+        """Gives back a spent token when no hedge could be sent."""
+        with self._lock:
+            self._tokens = min(self._tokens + 1.0, HEDGE_BURST)
+            self._stats["skipped_no_key"] += 1
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        with self._lock:
+            s = dict(self._stats)
+            s.update(enabled=self.enabled, percentile=self.percentile, budget=self.budget,
+                     delay_ms=round(delay * 1000, 1) if delay is not None else None,
+                     latency_samples=len(self._latencies), tokens=round(self._tokens, 2))
+        s["hedge_rate"] = round(s["hedges"] / s["primaries"], 4) if s["primaries"] else None
+        decided = s["hedge_wins"] + s["primary_wins"]
+        s["hedge_win_ratio"] = round(s["hedge_wins"] / decided, 3) if decided else None
+        return s
+
+
+async def hedged(policy: HedgePolicy, primary, launch_hedge):
+    """
+    Result of the `primary` coroutine, or of a duplicate from launch_hedge() (a coroutine, or None
+    when none can be sent) if the primary is still running after policy.delay(). The first success
+    wins and the other call is cancelled; raises the primary's error when every call fails.
+    """
+    if not policy.enabled:  # no stats, no budget: the call runs as if unhedged
+        return await primary
+    start = time.monotonic()
+    primary = asyncio.ensure_future(primary)
+    policy.start_primary()
+    hedge = None
+    try:
+        delay = policy.delay()
+        if delay is not None:
+            await asyncio.wait({primary}, timeout=delay)
+        if primary.done() or delay is None or not policy.try_spend():
+            result = await primary
+            policy.record(time.monotonic() - start)
+            return result
+
+        hedge_coro = launch_hedge()
+        if hedge_coro is None:
+            policy.refund()
+            result = await primary
+            policy.record(time.monotonic() - start)
+            return result
+        hedge_start = time.monotonic()
+        hedge = asyncio.ensure_future(hedge_coro)
+        policy.count("hedges")
+
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                won_by_hedge = task is hedge
+                policy.count("hedge_wins" if won_by_hedge else "primary_wins")
+                policy.record(time.monotonic() - (hedge_start if won_by_hedge else start))
+                return task.result()
+        policy.count("both_failed")
+        return primary.result()  # raises the primary's error
+    finally:
+        for task in (primary, hedge):
+            if task is not None and not task.done():
+                task.cancel()
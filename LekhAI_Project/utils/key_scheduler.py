@@ -0,0 +1,260 @@
+"""
+Key Scheduler — Quota-aware choice of the Gemini API key for each call, replacing blind round-robin.
+
+Per key it tracks:
+    cooldown     set from a 429 (Retry-After / RetryInfo delay, else exponential backoff);
+                 a per-day 429 or an exhausted quota estimate cools the key until the daily reset
+    quota        estimated calls left today: LEKHAI_KEY_DAILY_QUOTA, or learned from the count at
+                 which the key hit its per-day 429 (0 / unknown = no estimate)
+    latency      EWMA of successful call latency
+    error rate   EWMA of non-429 failures
+
+Ready keys sit in a heap ordered by expected cost (latency / success rate, scaled by calls in
+flight), least recently handed out first among equals; cooling keys sit in a second heap ordered by
+cooldown expiry and are never handed out. acquire() and the report calls are O(log n): state changes
+push a fresh heap entry and stale ones are skipped by version (and compacted away).
+
+One lock guards all state and nothing blocks while holding it, so the scheduler is safe to share
+between threads and asyncio tasks.
+"""
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")  # Gemini daily quotas reset at midnight Pacific
+except Exception:
+    QUOTA_TIMEZONE = timezone.utc
+
+KEY_DAILY_QUOTA = int(os.getenv("LEKHAI_KEY_DAILY_QUOTA", "0"))  # requests/day per key, 0 = learn from 429s
+KEY_COOLDOWN = float(os.getenv("LEKHAI_KEY_COOLDOWN", "30"))  # seconds, first 429 without a retry delay
+KEY_MAX_COOLDOWN = float(os.getenv("LEKHAI_KEY_MAX_COOLDOWN", "900"))
+KEY_EWMA_ALPHA = float(os.getenv("LEKHAI_KEY_EWMA_ALPHA", "0.2"))
+KEY_LATENCY_PRIOR = 2.0  # seconds assumed for a key with no successful call yet
+
+_RETRY_DELAY_RE = re.compile(r"retry(?:Delay)?\W*(?:in\s*)?([\d.]+)\s*s", re.IGNORECASE)
+_PER_DAY_RE = re.compile(r"per\s*day", re.IGNORECASE)
+
+
+def is_rate_limited(error) -> bool:
+    text = str(error)
+    return getattr(error, "code", None) == 429 or "429" in text or "RESOURCE_EXHAUSTED" in text or "quota" in text.lower()
+
+
+def retry_after_seconds(error):
+    """Retry delay of a 429: the Retry-After header, else the RetryInfo delay in the error body. None if absent."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return max(0.0, float(headers.get("retry-after")))
+        except (TypeError, ValueError):
+            pass
+    match = _RETRY_DELAY_RE.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def is_daily_limit(error) -> bool:
+    return bool(_PER_DAY_RE.search(str(error)))
+
+
+def _quota_day(wall: float):
+    return datetime.fromtimestamp(wall, QUOTA_TIMEZONE).date()
+
+
+def _seconds_to_reset(wall: float) -> float:
+    now = datetime.fromtimestamp(wall, QUOTA_TIMEZONE)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=QUOTA_TIMEZONE)
+    return max(1.0, (midnight - now).total_seconds())
+
+
+class _KeyState:
+    __slots__ = ("key", "index", "version", "cooldown_until", "exhausted", "backoff", "latency",
+                 "error_rate", "in_flight", "last_acquired", "day", "used_today", "learned_quota",
+                 "calls", "successes", "failures", "rate_limited")
+
+    def __init__(self, key, index, day):
+        self.key = key
+        self.index = index
+        self.version = 0
+        self.cooldown_until = 0.0  # time.monotonic()
+        self.exhausted = False  # cooling until the daily reset
+        self.backoff = 0  # consecutive 429s
+        self.latency = KEY_LATENCY_PRIOR
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.last_acquired = 0
+        self.day = day
+        self.used_today = 0
+        self.learned_quota = None
+        self.calls = self.successes = self.failures = self.rate_limited = 0
+
+
+class KeyScheduler:
+    def __init__(self, keys, name: str = "keys", daily_quota: int = KEY_DAILY_QUOTA):
+        self.name = name
+        self.daily_quota = daily_quota
+        today = _quota_day(time.time())
+        self._states = [_KeyState(key, i, today) for i, key in enumerate(dict.fromkeys(keys))]
+        self._by_key = {s.key: s for s in self._states}
+        self._ready = []  # (cost, last_acquired, index, version)
+        self._cooling = []  # (cooldown_until, index, version)
+        self._ticket = itertools.count(1)
+        self._lock = threading.Lock()
+        for state in self._states:
+            self._push(state, 0.0)
+
+    def __len__(self):
+        return len(self._states)
+
+    # --- heap bookkeeping (callers hold self._lock) ---
+    def _quota(self, state):
+        return self.daily_quota or state.learned_quota
+
+    def _cost(self, state) -> float:
+        return state.latency / max(1.0 - state.error_rate, 0.05) * (1 + state.in_flight)
+
+    def _push(self, state, now):
+        state.version += 1
+        if state.cooldown_until > now:
+            heapq.heappush(self._cooling, (state.cooldown_until, state.index, state.version))
+        else:
+            heapq.heappush(self._ready, (self._cost(state), state.last_acquired, state.index, state.version))
+        if len(self._ready) + len(self._cooling) > 4 * len(self._states) + 64:
+            self._compact(now)
+
+    def _compact(self, now):
+        """Drops stale entries: rebuilds both heaps from the current states (O(n))."""
+        self._ready = [(self._cost(s), s.last_acquired, s.index, s.version)
+                       for s in self._states if s.cooldown_until <= now]
+        self._cooling = [(s.cooldown_until, s.index, s.version) for s in self._states if s.cooldown_until > now]
+        heapq.heapify(self._ready)
+        heapq.heapify(self._cooling)
+
+    def _roll_day(self, state, wall):
+        day = _quota_day(wall)
+        if state.day != day:
+            state.day, state.used_today = day, 0
+
+    def _cool(self, state, seconds, now):
+        state.cooldown_until = max(state.cooldown_until, now + seconds)
+
+    # --- public API ---
+    def acquire(self, exclude=()):
+        """Best ready key not in `exclude` (marked in flight), or None when every such key is cooling."""
+        now, wall = time.monotonic(), time.time()
+        with self._lock:
+            while self._cooling and self._cooling[0][0] <= now:
+                _, index, version = heapq.heappop(self._cooling)
+                state = self._states[index]
+                if version == state.version:
+                    self._roll_day(state, wall)
+                    state.exhausted = False
+                    self._push(state, now)
+            skipped, chosen = [], None
+            while self._ready and chosen is None:
+                *_, index, version = heapq.heappop(self._ready)
+                state = self._states[index]
+                if version != state.version:
+                    continue
+                self._roll_day(state, wall)
+                quota = self._quota(state)
+                if quota and state.used_today >= quota:
+                    state.exhausted = True
+                    self._cool(state, _seconds_to_reset(wall), now)
+                    self._push(state, now)
+                elif state.key in exclude:
+                    skipped.append(state)
+                else:
+                    chosen = state
+            for state in skipped:
+                heapq.heappush(self._ready, (self._cost(state), state.last_acquired, state.index, state.version))
+            if chosen is None:
+                return None
+            chosen.in_flight += 1
+            chosen.calls += 1
+            chosen.used_today += 1
+            chosen.last_acquired = next(self._ticket)
+            self._push(chosen, now)
+            return chosen.key
+
+    def success(self, key, latency: float):
+        """A call on `key` succeeded after `latency` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._by_key[key]
+            state.in_flight = max(0, state.in_flight - 1)
+            state.successes += 1
+            state.backoff = 0
+            state.latency += KEY_EWMA_ALPHA * (latency - state.latency)
+            state.error_rate -= KEY_EWMA_ALPHA * state.error_rate
+            self._push(state, now)
+
+    def failure(self, key, error, latency: float = None):
+        """A call on `key` failed. 429s cool the key; other errors raise its error rate."""
+        now, wall = time.monotonic(), time.time()
+        with self._lock:
+            state = self._by_key[key]
+            state.in_flight = max(0, state.in_flight - 1)
+            if is_rate_limited(error):
+                state.rate_limited += 1
+                state.used_today = max(0, state.used_today - 1)  # rejected calls don't count against quota
+                if is_daily_limit(error):
+                    state.exhausted = True
+                    state.learned_quota = max(state.learned_quota or 0, state.used_today) or None
+                    self._cool(state, _seconds_to_reset(wall), now)
+                else:
+                    state.backoff += 1
+                    delay = retry_after_seconds(error)
+                    if delay is None:
+                        delay = min(KEY_COOLDOWN * 2 ** (state.backoff - 1), KEY_MAX_COOLDOWN)
+                    self._cool(state, delay, now)
+            else:
+                state.failures += 1
+                state.error_rate += KEY_EWMA_ALPHA * (1.0 - state.error_rate)
+                if latency is not None:
+                    state.latency += KEY_EWMA_ALPHA * (latency - state.latency)
+            self._push(state, now)
+
+    def release(self, key):
+        """A call on `key` was abandoned (cancelled) before an outcome; only its in-flight slot is freed."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._by_key[key]
+            state.in_flight = max(0, state.in_flight - 1)
+            self._push(state, now)
+
+    def next_ready_in(self) -> float:
+        """Seconds until some key can be handed out (0 if one is ready now)."""
+        now = time.monotonic()
+        with self._lock:
+            return max(0.0, min((s.cooldown_until for s in self._states), default=0.0) - now)
+
+    def stats(self) -> dict:
+        """Scheduler state for /metrics (keys are identified by position, never by value)."""
+        now, wall = time.monotonic(), time.time()
+        keys = []
+        with self._lock:
+            for s in self._states:
+                self._roll_day(s, wall)
+                quota = self._quota(s)
+                cooling = s.cooldown_until > now
+                keys.append({
+                    "key": f"{self.name}-{s.index + 1}",
+                    "state": "exhausted" if cooling and s.exhausted else "cooling" if cooling else "ready",
+                    "cooldown_seconds": round(s.cooldown_until - now, 1) if cooling else 0.0,
+                    "quota_remaining": max(0, quota - s.used_today) if quota else None,
+                    "used_today": s.used_today,
+                    "latency_ewma_ms": round(s.latency * 1000, 1),
+                    "error_rate": round(s.error_rate, 3),
+                    "in_flight": s.in_flight,
+                    "calls": s.calls,
+                    "successes": s.successes,
+                    "failures": s.failures,
+                    "rate_limited": s.rate_limited,
+                })
+        return {"available": sum(k["state"] == "ready" for k in keys), "total": len(keys), "keys": keys}
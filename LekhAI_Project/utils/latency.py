@@ -0,0 +1,35 @@
+"""
+Latency Window — Recent request latencies, reported as percentiles on /metrics.
+
+Used for time-to-first-token (when the user first sees script text) and total generation time.
+"""
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+LATENCY_WINDOW = int(os.getenv("LEKHAI_LATENCY_WINDOW", "500"))  # most recent samples kept
+
+
+class LatencyWindow:
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = np.array(self._samples) * 1000
+            count = self._count
+        if not len(samples):
+            return {"count": count, "window": 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {"count": count, "window": len(samples), "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1), "p99_ms": round(float(p99), 1),
+                "max_ms": round(float(samples.max()), 1)}
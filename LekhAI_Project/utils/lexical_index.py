@@ -0,0 +1,114 @@
+"""
+Lexical Index — BM25 over the full `script` column, fused with the dense ranking by reciprocal rank fusion.
+
+all-MiniLM-L6-v2 is an English model, so Bangla product words and phrases are close to invisible to the
+cosine ranking; exact term overlap catches them. BM25 weights are precomputed into one sparse
+(scripts x terms) matrix, so scoring queries is one sparse matrix product — no Python loop over scripts.
+
+Tokenizer: NFC, Latin lowercased, ZWJ/ZWNJ dropped (same conjunct typed different ways), ত্ + ZWJ folded
+to ৎ. A token is a run of Bengali-block characters (consonants, vowel signs and the hasanta all
+stay inside the word, so conjuncts like ক্ষ / ন্ত are never split) or a run of Latin letters/digits.
+Everything else — the dari (।), double dari (॥), punctuation, markdown table pipes — separates tokens.
+"""
+import os
+import re
+import unicodedata
+
+import numpy as np
+from scipy import sparse
+
+from utils.ann_index import top_k_scores
+
+BM25_K1 = float(os.getenv("LEKHAI_BM25_K1", "1.5"))
+BM25_B = float(os.getenv("LEKHAI_BM25_B", "0.75"))
+RRF_K = int(os.getenv("LEKHAI_RRF_K", "60"))
+RRF_DEPTH = int(os.getenv("LEKHAI_RRF_DEPTH", "50"))  # candidates taken from each ranking before fusion
+
+_TOKEN_RE = re.compile(r"[\u0980-\u09FF]+|[a-z0-9]+")
+_KHANDA_TA_RE = re.compile("\u09A4\u09CD\u200D")  # ত্ + ZWJ -> ৎ
+
+
+def tokenize(text: str) -> list:
+    """Bangla-aware word tokens (see module docstring)."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    text = _KHANDA_TA_RE.sub("\u09CE", text).replace("\u200D", "").replace("\u200C", "")
+    return _TOKEN_RE.findall(text)
+
+
+class Bm25Index:
+    def __init__(self, texts, k1: float = BM25_K1, b: float = BM25_B):
+        self.vocab = {}
+        rows, cols = [], []
+        for doc_id, text in enumerate(texts):
+            for token in tokenize(text):
+                rows.append(doc_id)
+                cols.append(self.vocab.setdefault(token, len(self.vocab)))
+        n_docs = len(texts)
+        # Duplicate (doc, term) entries are summed into term frequencies
+        tf = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                               shape=(n_docs, len(self.vocab)))
+        tf.sum_duplicates()
+
+        doc_len = np.asarray(tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 0.0
+        df = np.bincount(tf.indices, minlength=len(self.vocab))
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # Precomputed BM25 term weight for every nonzero (doc, term)
+        norm = k1 * (1 - b + b * doc_len / max(avg_len, 1e-9))
+        row_of = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+        weights = idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + norm[row_of])
+        # Stored CSC so that .T is a CSR (terms x scripts) matrix, the layout the query product wants
+        self.matrix = sparse.csr_matrix((weights.astype(np.float32), tf.indices, tf.indptr),
+                                        shape=tf.shape).tocsc()
+        self.size = n_docs
+
+    def scores_batch(self, queries, rows=None) -> np.ndarray:
+        """
+        (n_queries, n_scripts) BM25 scores as one sparse product: (queries x terms) occurrence counts
+        times the transposed weight matrix. Per query this is the sum of its terms' weight columns.
+        `rows` scores only those scripts, in that order (-> (n_queries, len(rows))).
+        """
+        query_ids, term_ids = [], []
+        for query_id, query in enumerate(queries):
+            for token in tokenize(query):
+                term_id = self.vocab.get(token)
+                if term_id is not None:
+                    query_ids.append(query_id)
+                    term_ids.append(term_id)
+        # Repeated query terms count once per occurrence, as in the query-term sum of BM25
+        query_terms = sparse.csr_matrix((np.ones(len(query_ids), dtype=np.float32), (query_ids, term_ids)),
+                                        shape=(len(queries), len(self.vocab)))
+        weights = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=np.int64)]
+        return np.asarray((query_terms @ weights.T).todense(), dtype=np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every script for `query` (0 where no term overlaps)."""
+        return self.scores_batch([query])[0]
+
+    def top_k_batch(self, queries, k: int) -> list:
+        """[(indices, scores), ...] of the best-matching scripts with a nonzero score, best first."""
+        scores = self.scores_batch(queries)
+        top, top_scores = top_k_scores(scores, k)
+        return [(idx[s > 0], s[s > 0]) for idx, s in zip(top, top_scores)]
+
+    def top_k(self, query: str, k: int):
+        return self.top_k_batch([query], k)[0]
+
+
+def reciprocal_rank_fusion(rankings, k: int = RRF_K):
+    """
+    Fuses ranked index lists (best first) with RRF: score(d) = sum 1 / (k + rank_d), rank from 1.
+    Returns (indices, fused scores), best first.
+    """
+    rankings = [np.asarray(r, dtype=np.int64) for r in rankings if len(r)]
+    if not rankings:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    ids = np.concatenate(rankings)
+    contributions = np.concatenate([1.0 / (k + np.arange(1, len(r) + 1)) for r in rankings])
+    unique, inverse = np.unique(ids, return_inverse=True)
+    fused = np.bincount(inverse, weights=contributions)
+    order = np.argsort(-fused, kind="stable")
+    return unique[order], fused[order]
@@ -0,0 +1,72 @@
+"""
+Metadata Index — Inverted indexes over industry, tone_1, tone_2 and product for filtered retrieval.
+
+Each column is factorized once into (distinct lowercased values, per-row value codes). A lookup
+matches the query against the small vocabulary, then expands the matching codes into a row bitmap
+with one vectorized isin. priority() layers those bitmaps with the notebook's smart-retrieval
+weights:
+
+    product   exact 3, partial (substring either way) 2   per matched product
+    industry  exact 2
+    tone      first requested tone 2, further tones 1      (matched against tone_1 or tone_2)
+"""
+import numpy as np
+import pandas as pd
+
+PRODUCT_EXACT, PRODUCT_PARTIAL = 3, 2
+INDUSTRY_MATCH = 2
+PRIMARY_TONE, SECONDARY_TONE = 2, 1
+
+
+class _ColumnIndex:
+    def __init__(self, values):
+        normalized = pd.Series(values, dtype="object").fillna("").astype(str).str.lower().str.strip()
+        codes, vocab = pd.factorize(normalized)
+        self.codes = codes.astype(np.int32)
+        self.vocab = list(vocab)
+
+    def rows(self, value_ids):
+        return np.isin(self.codes, value_ids) if value_ids else np.zeros(len(self.codes), dtype=bool)
+
+    def exact(self, value: str) -> np.ndarray:
+        value = value.lower().strip()
+        return self.rows([i for i, v in enumerate(self.vocab) if v == value])
+
+    def partial(self, value: str) -> np.ndarray:
+        """Rows whose value contains, or is contained in, `value` (exact matches excluded)."""
+        value = value.lower().strip()
+        return self.rows([i for i, v in enumerate(self.vocab)
+                          if v and v != value and (value in v or v in value)])
+
+    def overlap(self, value: str) -> np.ndarray:
+        """Exact or partial match."""
+        value = value.lower().strip()
+        return self.rows([i for i, v in enumerate(self.vocab) if v and (value in v or v in value)])
+
+
+class MetadataIndex:
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        empty = [""] * self.size
+        self.columns = {
+            col: _ColumnIndex(df[col] if col in df.columns else empty)
+            for col in ("industry", "tone_1", "tone_2", "product")
+        }
+
+    def priority(self, products=None, industry: str = None, tones=None) -> np.ndarray:
+        """Per-row int priority for the requested products / industry / tones (0 = no match)."""
+        score = np.zeros(self.size, dtype=np.int32)
+        product_index = self.columns["product"]
+        for prod in products or []:
+            if prod and prod.strip():
+                score += PRODUCT_EXACT * product_index.exact(prod)
+                score += PRODUCT_PARTIAL * product_index.partial(prod)
+
+        if industry and industry.strip():
+            score += INDUSTRY_MATCH * self.columns["industry"].exact(industry)
+
+        requested = [t for t in tones or [] if t and t.strip()]
+        for t_idx, tone in enumerate(requested):
+            matched = self.columns["tone_1"].overlap(tone) | self.columns["tone_2"].overlap(tone)
+            score += (PRIMARY_TONE if t_idx == 0 else SECONDARY_TONE) * matched
+        return score
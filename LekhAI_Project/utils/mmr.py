@@ -0,0 +1,46 @@
+"""
+MMR — Maximal Marginal Relevance selection over normalized embedding rows.
+
+    pick argmax  lambda * relevance(d) - (1 - lambda) * max_{s in selected} cos(d, s)
+
+The candidate x candidate similarity matrix is computed once; each pick updates the running
+max-similarity vector with one np.maximum, so selection is k vector updates, not nested loops.
+"""
+import os
+
+import numpy as np
+
+MMR_LAMBDA = float(os.getenv("LEKHAI_MMR_LAMBDA", "0.7"))
+MMR_POOL = int(os.getenv("LEKHAI_MMR_POOL", "15"))  # best-ranked candidates MMR chooses from
+# Relevance bonus per metadata priority point (product 3/2, industry 2, tone 2/1), so that inside the
+# pool a better metadata match still outranks a slightly closer embedding
+MMR_PRIORITY_WEIGHT = float(os.getenv("LEKHAI_MMR_PRIORITY_WEIGHT", "0.1"))
+
+
+def mmr_select(relevance, vectors, k: int, lambda_: float = MMR_LAMBDA, seen=None) -> np.ndarray:
+    """
+    Positions (into `relevance` / `vectors`) of the k MMR picks, in pick order.
+    `seen`: vectors already chosen elsewhere (e.g. another reference set) that new picks
+    should also stay away from.
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    k = min(k, len(relevance))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    similarity = vectors @ vectors.T
+    if seen is not None and len(seen):
+        max_sim = (vectors @ np.asarray(seen, dtype=np.float32).T).max(axis=1)
+    else:
+        max_sim = np.full(len(relevance), -np.inf, dtype=np.float32)
+
+    picks = np.empty(k, dtype=np.int64)
+    available = np.ones(len(relevance), dtype=bool)
+    for step in range(k):
+        redundancy = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        score = np.where(available, lambda_ * relevance - (1 - lambda_) * redundancy, -np.inf)
+        pick = int(np.argmax(score))
+        picks[step] = pick
+        available[pick] = False
+        np.maximum(max_sim, similarity[pick], out=max_sim)
+    return picks
@@ -0,0 +1,68 @@
+"""
+Quantized Embeddings — Compact in-memory copy of the embedding matrix for first-pass scoring.
+
+    float32  no compact copy; every query scans the float32 matrix (default)
+    float16  half-precision copy (2x smaller; numpy widens float16 slowly on CPU, so scans cost more)
+    int8     per-dimension scaled int8 codes (4x smaller, scans as fast as float32): x[:, d] ~= codes[:, d] * scale[d]
+
+Select with LEKHAI_EMBED_STORAGE. The first pass scores the whole corpus on the compact copy;
+only the top RESCORE_DEPTH candidates are rescored exactly against the float32 matrix, which stays
+memory-mapped on disk, so only the pages of the candidate rows are ever read.
+"""
+import os
+
+import numpy as np
+
+EMBED_STORAGE = os.getenv("LEKHAI_EMBED_STORAGE", "float32").lower()
+RESCORE_DEPTH = int(os.getenv("LEKHAI_RESCORE_DEPTH", "50"))  # candidate scripts rescored in float32
+BLOCK_ROWS = 1024  # rows widened to float32 at a time (stays in cache) while scoring / building
+STORAGE_TYPES = ("float32", "float16", "int8")
+
+
+class QuantizedMatrix:
+    def __init__(self, matrix, storage: str):
+        rows, dim = matrix.shape
+        self.storage = storage
+        self.scale = None
+        if storage == "float16":
+            self.data = np.empty((rows, dim), dtype=np.float16)
+        else:
+            # Per-dimension scale from the column-wise max |x| (one streaming pass over the mmap)
+            peak = np.zeros(dim, dtype=np.float32)
+            for start in range(0, rows, BLOCK_ROWS):
+                np.maximum(peak, np.abs(matrix[start:start + BLOCK_ROWS]).max(axis=0), out=peak)
+            self.scale = np.maximum(peak, 1e-12) / 127.0
+            self.data = np.empty((rows, dim), dtype=np.int8)
+        for start in range(0, rows, BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+            if self.scale is not None:
+                block = np.clip(np.rint(block / self.scale), -127, 127)
+            self.data[start:start + BLOCK_ROWS] = block
+
+    def scores(self, query_vecs) -> np.ndarray:
+        """Approximate dot products with every row, for one query (1-D) or a batch (n_queries x rows)."""
+        q = np.asarray(query_vecs, dtype=np.float32)
+        if self.scale is not None:
+            q = q * self.scale  # fold the dequantization into the query
+        out = np.empty(q.shape[:-1] + (len(self.data),), dtype=np.float32)
+        for start in range(0, len(self.data), BLOCK_ROWS):
+            out[..., start:start + BLOCK_ROWS] = q @ self.data[start:start + BLOCK_ROWS].astype(np.float32).T
+        return out
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+
+def build_compact(embeddings, storage: str = None):
+    """QuantizedMatrix for float16/int8 storage, None for float32 (or no embeddings)."""
+    storage = (storage or EMBED_STORAGE).lower()
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Unknown embedding storage '{storage}'. Choose one of: {', '.join(STORAGE_TYPES)}")
+    if embeddings is None or storage == "float32" or len(embeddings) == 0:
+        return None
+    compact = QuantizedMatrix(embeddings, storage)
+    full_mb = embeddings.shape[0] * embeddings.shape[1] * 4 / 2**20
+    print(f"[INFO] Embedding storage {storage}: {compact.nbytes / 2**20:.2f} MB first pass "
+          f"vs {full_mb:.2f} MB float32 ({1 - compact.nbytes / 2**20 / full_mb:.0%} saved).")
+    return compact
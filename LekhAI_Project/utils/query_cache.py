@@ -0,0 +1,98 @@
+"""
+Query Embedding Cache — Size-bounded LRU (optional TTL) in front of the encoder.
+
+smart_retrieve's queries repeat heavily (the same brief re-sent with another duration or dialect),
+so each normalized query text is encoded once. Key normalization: Unicode NFC, whitespace runs
+collapsed to one space, Latin letters lowercased (Bangla untouched). all-MiniLM-L6-v2 is uncased,
+so the key never merges queries that would embed differently.
+
+Thread-safe for FastAPI's threadpool; the encode itself runs outside the lock.
+"""
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+QUERY_CACHE_SIZE = int(os.getenv("LEKHAI_QUERY_CACHE_SIZE", "1024"))  # 0 = disabled
+QUERY_CACHE_TTL = float(os.getenv("LEKHAI_QUERY_CACHE_TTL", "0"))  # seconds, 0 = no expiry
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_LATIN_RE = re.compile(r"[A-Za-zÀ-ɏ]+")
+
+
+def normalize_query(text: str) -> str:
+    text = unicodedata.normalize("NFC", str(text))
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _LATIN_RE.sub(lambda m: m.group(0).lower(), text)
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (vector, stored_at), least recently used first
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, query: str, encode_fn):
+        """Embedding of one query; same path (and counters) as get_many."""
+        return self.get_many([query], encode_fn)[0]
+
+    def get_many(self, queries, encode_fn) -> np.ndarray:
+        """
+        (n_queries, dim) embeddings; all cache misses are encoded in a single encode_fn call.
+        Counters count distinct keys: a key repeated within one batch (e.g. the two reference
+        queries of an unclassified brief) is one lookup, a hit or a miss, not an extra hit.
+        """
+        keys = [normalize_query(q) for q in queries]
+        if self.max_size <= 0:
+            return encode_fn(keys)
+
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl and now - entry[1] > self.ttl:
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            self._stats["misses"] += len(missing)
+            self._stats["hits"] += len(found)
+
+        if missing:
+            vectors = encode_fn(missing)
+            vectors.setflags(write=False)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._entries[key] = (vector, now)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        return np.vstack([found[k] for k in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats, size=len(self._entries))
+        s.update(max_size=self.max_size, ttl_seconds=self.ttl)
+        lookups = s["hits"] + s["misses"]
+        s["hit_ratio"] = round(s["hits"] / lookups, 3) if lookups else None
+        return s
+
+
+# Global instance
+query_cache = QueryEmbeddingCache()
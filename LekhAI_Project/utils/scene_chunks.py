@@ -0,0 +1,136 @@
+"""
+Scene Chunks — Splits each reference script into scene-level chunks for multi-vector retrieval.
+
+Scripts are markdown: Visual/Audio tables (one scene per body row), prose scenes separated by
+`---` rules and `#` headings, and short paragraphs. Every chunk is prefixed with the script's
+industry / tone / product (what search_text carried) and embedded as one row of a single contiguous
+matrix. `offsets` is the chunk -> script map in CSR form: script i owns rows offsets[i]:offsets[i+1].
+
+A script's score is an aggregation of its chunk scores, computed with vectorized segment reductions:
+    max         best chunk (max-sim)
+    mean-top-n  mean of the n best chunks (LEKHAI_CHUNK_TOP_N)
+"""
+import os
+import re
+
+import numpy as np
+
+CHUNK_MAX_CHARS = int(os.getenv("LEKHAI_CHUNK_MAX_CHARS", "400"))  # ~ the encoder's 256-token window for Bangla
+CHUNK_AGGREGATION = os.getenv("LEKHAI_CHUNK_AGGREGATION", "max").lower()
+CHUNK_TOP_N = int(os.getenv("LEKHAI_CHUNK_TOP_N", "2"))
+CHUNK_ANN_OVERFETCH = int(os.getenv("LEKHAI_CHUNK_ANN_OVERFETCH", "10"))  # HNSW chunk hits per requested script
+
+_SEPARATOR_CELL_RE = re.compile(r"^:?-{2,}:?$")
+_RULE_RE = re.compile(r"^\s*(-{3,}|\*{3,}|_{3,})\s*$")
+_MARKUP_RE = re.compile(r"\*\*|__|<br\s*/?>|^#+\s*|^\s*[-*]\s+", re.MULTILINE)
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", _MARKUP_RE.sub(" ", text)).strip()
+
+
+def _cells(line: str) -> list:
+    return [c.strip() for c in line.strip().strip("|").split("|")]
+
+
+def _pack(paragraphs, max_chars):
+    """Greedily joins consecutive paragraphs into chunks of up to max_chars."""
+    chunks, current = [], ""
+    for para in paragraphs:
+        if current and len(current) + 1 + len(para) > max_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current} {para}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_scenes(script: str, max_chars: int = CHUNK_MAX_CHARS) -> list:
+    """
+    Scene chunks of one script: each table body row is a scene; prose between headings, rules
+    and tables is a section whose paragraphs are packed into chunks of up to max_chars.
+    """
+    chunks, paragraphs, para = [], [], []
+
+    def end_paragraph():
+        text = _clean("\n".join(para))
+        if text:
+            paragraphs.append(text)
+        para.clear()
+
+    def end_section():
+        end_paragraph()
+        chunks.extend(_pack(paragraphs, max_chars))
+        paragraphs.clear()
+
+    lines = str(script).splitlines()
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            end_section()
+            cells = _cells(stripped)
+            if all(_SEPARATOR_CELL_RE.match(c) for c in cells if c):
+                continue
+            next_line = lines[i + 1].strip() if i + 1 < len(lines) else ""
+            if next_line.startswith("|") and all(_SEPARATOR_CELL_RE.match(c) for c in _cells(next_line) if c):
+                continue  # header row
+            scene = _clean(" ".join(c for c in cells if c))
+            if scene:
+                chunks.append(scene)
+        elif _RULE_RE.match(line) or stripped.startswith("#"):
+            end_section()
+            if stripped.startswith("#"):
+                para.append(stripped)  # heading opens the next section
+        elif not stripped:
+            end_paragraph()
+        else:
+            para.append(stripped)
+    end_section()
+    return chunks or [_clean(str(script))[:max_chars]]
+
+
+def scene_chunks(df, max_chars: int = CHUNK_MAX_CHARS):
+    """
+    (chunk texts, offsets) for the whole corpus. Each chunk carries the script's
+    "industry tone product" prefix; offsets has len(df) + 1 entries.
+    """
+    texts, counts = [], []
+    prefixes = (df["industry"].astype(str) + " " + df["tone"].astype(str) + " " + df["product"].astype(str)).tolist()
+    for prefix, script in zip(prefixes, df["script"].tolist()):
+        scenes = split_scenes(script, max_chars)
+        texts.extend(f"{prefix} | {scene}" for scene in scenes)
+        counts.append(len(scenes))
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return texts, offsets
+
+
+# ---------- segment reductions (segments = consecutive runs, one per script) ----------
+
+def segment_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Max per segment along the last axis; every segment must be non-empty."""
+    return np.maximum.reduceat(values, starts, axis=-1)
+
+
+def segment_mean_top_n(values: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    """Mean of the n largest values per segment along the last axis (all of them for shorter segments)."""
+    size = values.shape[-1]
+    lengths = np.diff(np.append(starts, size))
+    segment = np.broadcast_to(np.repeat(np.arange(len(starts)), lengths), values.shape)
+    # Segments stay in place; within each, values are sorted descending
+    ordered = np.take_along_axis(values, np.lexsort((-values, segment), axis=-1), axis=-1)
+    keep = (np.arange(size) - np.repeat(starts, lengths)) < n
+    sums = np.add.reduceat(np.where(keep, ordered, 0), starts, axis=-1)
+    return (sums / np.minimum(lengths, n)).astype(values.dtype, copy=False)
+
+
+def aggregate(values: np.ndarray, starts: np.ndarray, method: str = None, n: int = None) -> np.ndarray:
+    """Per-script scores from chunk scores (max or mean-top-n); 1-D or one row per query."""
+    method = method or CHUNK_AGGREGATION
+    if method == "max":
+        return segment_max(values, starts)
+    if method == "mean-top-n":
+        return segment_mean_top_n(values, starts, n or CHUNK_TOP_N)
+    raise ValueError(f"Unknown chunk aggregation '{method}'. Choose max or mean-top-n.")
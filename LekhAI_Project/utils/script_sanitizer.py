@@ -0,0 +1,116 @@
+"""
+Script Sanitizer — Cleans malformed Gemini output (whitespace floods, runaway repeated characters).
+
+sanitize_script() cleans a finished script; StreamSanitizer applies the same rules to text that
+arrives in chunks (/generate/stream), holding back only what the next chunk could still change:
+trailing spaces and newlines, and the part of a repeated-character run past RUN_KEEP.
+"""
+import re
+
+MAX_CHARS = 8000  # hard cap on script length
+RUN_KEEP = 20     # a run of one repeated non-alphanumeric character longer than RUN_LIMIT...
+RUN_LIMIT = 50    # ...is cut down to RUN_KEEP characters
+TRUNCATION_NOTICE = '\n\n---\n*(Script truncated for safety)*'
+
+_ALNUM = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+_NEWLINE_FLOOD = re.compile(r'\n{3,}')
+_CHAR_RUN = re.compile(r'([^a-zA-Z0-9\s])\1{%d,}' % RUN_LIMIT)
+
+
+def sanitize_script(text: str) -> str:
+    """Clean malformed Gemini output: collapse excessive whitespace, trim."""
+    if not text:
+        return text
+    # 1. Remove trailing whitespace from each line (first, so whitespace-only lines count as blank in step 2)
+    text = '\n'.join(line.rstrip() for line in text.split('\n'))
+    # 2. Replace any sequence of 3+ newlines with exactly 2 (preserve paragraph breaks)
+    text = _NEWLINE_FLOOD.sub('\n\n', text)
+    # 3. Collapse runs of identical non-alphanumeric characters (more than 50 in a row, reducing to 20)
+    #    This catches runaway hyphens, asterisks, dots, etc. often involved in infinite loops.
+    text = _CHAR_RUN.sub(lambda m: m.group(1) * RUN_KEEP, text)
+    # 4. Strip leading/trailing whitespace from entire output
+    text = text.strip()
+    # 5. Hard cap: if output exceeds 8000 chars, truncate to last complete line
+    if len(text) > MAX_CHARS:
+        text = text[:MAX_CHARS].rsplit('\n', 1)[0]
+        text += TRUNCATION_NOTICE
+    return text
+
+
+class StreamSanitizer:
+    """
+    sanitize_script() for a script arriving in chunks: feed() each chunk and show what it returns,
+    then show finish(). Below the cap the pieces join to exactly sanitize_script(full text). At the
+    cap the stream stops where it is (text already shown can't be taken back, so the current line
+    is not cut back to its start) and the truncation notice follows.
+    """
+
+    def __init__(self, max_chars: int = MAX_CHARS):
+        self.max_chars = max_chars
+        self.truncated = False
+        self._emitted = 0
+        self._started = False  # leading whitespace is dropped until the first visible character
+        self._newlines = 0     # held: only written once more text follows, at most two
+        self._spaces = ""      # held: dropped if the line ends here
+        self._run_char = None  # current run of one non-alphanumeric character
+        self._run_len = 0      # its first RUN_KEEP characters are already written
+        self._out = []
+
+    def feed(self, chunk: str) -> str:
+        """Sanitized text that is final now (may be empty)."""
+        for c in chunk or "":
+            if self.truncated:
+                break
+            self._step(c)
+        return self._drain()
+
+    def finish(self) -> str:
+        """The rest, at the end of the stream: a held run is settled, trailing whitespace dropped."""
+        self._end_run()
+        self._newlines, self._spaces = 0, ""
+        return self._drain()
+
+    def _drain(self):
+        out = "".join(self._out)
+        self._out = []
+        return out
+
+    def _emit(self, text):
+        if self.truncated:
+            return
+        if self._emitted + len(text) > self.max_chars:
+            self.truncated = True
+            self._out.append(TRUNCATION_NOTICE)
+            return
+        self._emitted += len(text)
+        self._out.append(text)
+
+    def _end_run(self):
+        if RUN_KEEP < self._run_len <= RUN_LIMIT:
+            self._emit(self._run_char * (self._run_len - RUN_KEEP))
+        self._run_char, self._run_len = None, 0
+
+    def _step(self, c):
+        if c == self._run_char:
+            self._run_len += 1
+            if self._run_len <= RUN_KEEP:
+                self._emit(c)
+            return
+        self._end_run()
+        if c == "\n":
+            self._spaces = ""  # trailing whitespace of the line just ended
+            self._newlines += self._started
+        elif c.isspace():
+            if self._started:
+                self._spaces += c
+        else:
+            if self._newlines:
+                self._emit("\n" * min(self._newlines, 2))
+                self._newlines = 0
+            if self._spaces:
+                self._emit(self._spaces)
+                self._spaces = ""
+            self._started = True
+            self._emit(c)
+            if c not in _ALNUM:
+                self._run_char, self._run_len = c, 1
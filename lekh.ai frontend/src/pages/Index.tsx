@@ -37,15 +37,15 @@ const Index = () => {
     "Finalizing script format..."
   ];
 
-  // Sanitize script output to prevent whitespace flooding
+  // Sanitize script output to prevent whitespace flooding (mirrors utils/script_sanitizer.py)
   const sanitizeScript = (text: string): string => {
     if (!text) return text;
+    // Remove trailing whitespace from each line (first, so whitespace-only lines count as blank)
+    text = text.split('\n').map(line => line.trimEnd()).join('\n');
     // Collapse 3+ newlines to 2
     text = text.replace(/\n{3,}/g, '\n\n');
     // Collapse runs of identical non-alphanumeric characters (matches 50+ repetitions, reducing to 20)
     text = text.replace(/([^a-zA-Z0-9\s])\1{50,}/g, '$1'.repeat(20));
-    // Remove trailing whitespace from each line
-    text = text.split('\n').map(line => line.trimEnd()).join('\n');
     // Trim entire output
     return text.trim();
   };
@@ -129,7 +129,7 @@ Hook Style: ${dna.hook_style}
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 90000); // 90s safety timeout
 
-      const response = await fetch(`${API_URL}/generate`, {
+      const response = await fetch(`${API_URL}/generate/stream`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         signal: controller.signal,
@@ -145,14 +145,46 @@ Hook Style: ${dna.hook_style}
         }),
       });
 
-      clearTimeout(timeoutId);
-
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
+        clearTimeout(timeoutId);
         const errData = await response.json().catch(() => ({}));
         throw new Error(errData.detail || `Server error (${response.status})`);
       }
 
-      const data = await response.json();
+      // Server-Sent Events: "token" events carry sanitized script text as it is written,
+      // "done" carries the same result /generate returns, "error" ends a failed generation.
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      let streamed = "";
+      let data: any = null;
+      try {
+        while (data === null) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const events = buffer.split("\n\n");
+          buffer = events.pop() ?? "";
+          for (const raw of events) {
+            const event = raw.match(/^event: (.*)$/m)?.[1];
+            const payload = raw.match(/^data: (.*)$/m)?.[1];
+            if (!event || payload === undefined) continue;
+            const body = JSON.parse(payload);
+            if (event === "token") {
+              streamed += body.text;
+              setDisplayedContent(streamed);
+            } else if (event === "error") {
+              throw new Error(body.detail || "Generation failed.");
+            } else if (event === "done") {
+              data = body;
+            }
+          }
+        }
+      } finally {
+        // Also on an error event or a malformed payload: no late abort, no stream left open
+        clearTimeout(timeoutId);
+        reader.cancel().catch(() => {});
+      }
+      if (data === null) throw new Error("Connection to the server was lost during generation.");
 
       // Handle Quota Warnings
       if (data.warning === "CRITICAL_QUOTA_EXHAUSTED") {
@@ -161,9 +193,12 @@ Hook Style: ${dna.hook_style}
         toast.warning(data.warning);
       }
 
-      const rawScript = data.script || data.result || "No script was generated. Please try again.";
+      const rawScript = data.script || streamed || "No script was generated. Please try again.";
       const script = sanitizeScript(rawScript);
+      // Already shown as it streamed: skip the typing animation
+      setIsGenerating(false);
       setGeneratedContent(script);
+      setDisplayedContent(script);
       if (data.db_id) setScriptId(data.db_id);
 
     } catch (err: any) {